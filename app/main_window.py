@@ -6,7 +6,7 @@ import sys
 import os
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, 
                              QStatusBar, QMessageBox, QAction, QActionGroup, QMenu, QFileDialog)
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, pyqtSlot
 
 from core.video_thread import VideoThread
 from core.pose_processor import PoseProcessor
@@ -171,6 +171,13 @@ class WorkoutTrackerApp(QMainWindow):
         try:
             print("[Settings] 正在恢复UI设置...")
             self.control_panel.restore_from_settings(self.settings_manager)
+            # 恢复TTS模式：用户设置里保存过模式时按切换逻辑应用（不回写设置），
+            # 否则沿用tts_config.json中的模式；下拉框只同步显示，不触发tts_mode_changed
+            saved_tts = self.settings_manager.get('tts_mode')
+            if saved_tts in ('sound', 'ha'):
+                self._apply_tts_mode(saved_tts)
+                print(f"[Settings] 恢复TTS模式: {saved_tts}")
+            self.control_panel.set_tts_mode(self.tts_config.get('mode', 'sound'))
             print("[Settings] UI设置恢复完成")
         except Exception as e:
             print(f"[Settings] UI设置恢复失败: {e}")
@@ -469,20 +476,28 @@ class WorkoutTrackerApp(QMainWindow):
                 }
             }
         
-        # 创建HA API管理器
+        # 创建HA API管理器（保存HA配置后会重新调用：先关闭旧管理器及其保活线程）
+        if getattr(self, 'ha_api', None) is not None:
+            self.ha_api.close()
         ha_config = self.tts_config.get('ha_config', {})
         self.ha_api = HAAPIManager(
             ha_config.get('base_url', ''),
             ha_config.get('token', '')
         )
+        if self.tts_config.get('mode', 'sound') == 'ha':
+            self.ha_api.prewarm()
         print(f"[TTS] 初始化完成，模式: {self.tts_config.get('mode', 'sound')}")
     
     def change_tts_mode(self, mode):
         """切换TTS模式"""
-        self.tts_config['mode'] = mode
         # Save to settings
         self.settings_manager.set('tts_mode', mode)
         print(f"[TTS] 切换模式: {mode}")
+        self._apply_tts_mode(mode)
+    
+    def _apply_tts_mode(self, mode):
+        """应用TTS模式：进入HA时重新加载配置并预热保活，离开HA时停止保活"""
+        self.tts_config['mode'] = mode
         
         # 重新加载HA配置
         if mode == 'ha':
@@ -491,12 +506,17 @@ class WorkoutTrackerApp(QMainWindow):
                 with open('data/tts_config.json', 'r', encoding='utf-8') as f:
                     config = json.load(f)
                     ha_config = config.get('ha_config', {})
+                    # 用户切换到HA：预热连接并保活
                     self.ha_api.update_config(
                         ha_config.get('base_url', ''),
-                        ha_config.get('token', '')
+                        ha_config.get('token', ''),
+                        prewarm=True
                     )
             except Exception as e:
                 print(f"[错误] 加载HA配置失败: {e}")
+        else:
+            # 离开HA模式：停止保活，不再定期请求HA
+            self.ha_api.stop_keepalive()
     
     def announce_count(self, count, exercise_name):
         """播报计数"""
@@ -613,14 +633,17 @@ class WorkoutTrackerApp(QMainWindow):
         """更新所有统计概览"""
         self.stats_manager.update_stats_overview()
     
+    @pyqtSlot(int, int)
     def load_month_stats(self, year, month):
         """加载指定月份的统计数据"""
         self.stats_manager.load_month_stats(year, month)
     
+    @pyqtSlot(str, int)
     def update_goal(self, exercise_type, count):
         """更新运动目标"""
         self.stats_manager.update_goal(exercise_type, count)
     
+    @pyqtSlot(int)
     def update_weekly_goal(self, count):
         """更新周目标"""
         self.stats_manager.update_weekly_goal(count)
@@ -630,5 +653,10 @@ class WorkoutTrackerApp(QMainWindow):
         if self.video_thread.isRunning():
             self.video_thread.stop()
         
+        if hasattr(self, 'sound_manager') and self.sound_manager:
+            self.sound_manager.close()
+        
+        if hasattr(self, 'ha_api') and self.ha_api:
+            self.ha_api.close()
         
         event.accept() 
\ No newline at end of file
@@ -2,7 +2,8 @@
 """
 WebSocket Audio Server for Browser Audio Playback
 - Runs WebSocket server on port 8765
-- Serves audio files via HTTP on port 8766
+- Serves audio files via HTTP on port 8080
+- Receives SoundManager events on /tmp/goodgym_audio.sock and TCP port 8865
 - Broadcasts audio play events to connected browsers
 """
 
@@ -11,27 +12,54 @@ import json
 import os
 import sys
 import base64
+import hmac
 import urllib.parse
+import socket
+import struct
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 import threading
 
+import websockets
+
+from core.json_utils import json_dumps, json_loads
+
 # Configuration
+AUDIO_WS_PORT = 8765
+AUDIO_HTTP_PORT = 8080
+AUDIO_DIR = os.path.dirname(os.path.abspath(__file__))
 AUTH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'auth.json')
 
+# Parsed auth.json and its expected Basic Auth header, refreshed only when the file changes
+_auth_cache = {'mtime': None, 'data': None, 'header': None}
+
 def load_auth():
-    if not os.path.exists(AUTH_FILE):
-        return None
     try:
-        with open(AUTH_FILE, 'r') as f:
-            return json.load(f)
-    except:
+        mtime = os.stat(AUTH_FILE).st_mtime
+    except OSError:
+        _auth_cache.update(mtime=None, data=None, header=None)
         return None
+    
+    if mtime != _auth_cache['mtime']:
+        try:
+            with open(AUTH_FILE, 'rb') as f:
+                data = json_loads(f.read())
+            credentials = f"{data['username']}:{data['password']}"
+        except:
+            return None
+        _auth_cache.update(
+            mtime=mtime,
+            data=data,
+            header=b"Basic " + base64.b64encode(credentials.encode())
+        )
+    return _auth_cache['data']
 
 def save_auth(username, password):
     data = {'username': username, 'password': password}
     os.makedirs(os.path.dirname(AUTH_FILE), exist_ok=True)
-    with open(AUTH_FILE, 'w') as f:
-        json.dump(data, f)
+    with open(AUTH_FILE, 'wb') as f:
+        f.write(json_dumps(data))
+    # Force a reload even if the mtime did not tick
+    _auth_cache['mtime'] = None
 
 def get_setup_page(error=None):
     error_html = f'<div style="color:red;margin-bottom:10px;">{error}</div>' if error else ''
@@ -69,6 +97,9 @@ def get_setup_page(error=None):
 </html>
 """.encode('utf-8')
 
+# The error-free setup page never changes, render it once
+_SETUP_PAGE_CACHE = get_setup_page()
+
 class AudioHTTPHandler(SimpleHTTPRequestHandler):
     """HTTP handler for serving audio files with Basic Auth"""
     
@@ -86,6 +117,13 @@ class AudioHTTPHandler(SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', '*')
         super().end_headers()
 
+    def copyfile(self, source, outputfile):
+        """Send file bodies with sendfile() so the kernel copies them straight to the socket
+        
+        socket.sendfile falls back to plain send() where sendfile is unavailable.
+        """
+        self.connection.sendfile(source)
+
     def do_POST(self):
         """Handle Setup POST"""
         auth_data = load_auth()
@@ -126,7 +164,7 @@ class AudioHTTPHandler(SimpleHTTPRequestHandler):
                 self.send_response(200)
                 self.send_header('Content-Type', 'text/html')
                 self.end_headers()
-                self.wfile.write(get_setup_page())
+                self.wfile.write(_SETUP_PAGE_CACHE)
                 return
             else:
                 # Redirect everything to setup
@@ -137,10 +175,11 @@ class AudioHTTPHandler(SimpleHTTPRequestHandler):
 
         # 2. CHECK HEADER
         # Allow Basic Auth
-        target_header = f"Basic {base64.b64encode(f'{auth_data['username']}:{auth_data['password']}'.encode()).decode()}"
+        target_header = _auth_cache['header']
         auth_header = self.headers.get('Authorization')
         
-        if not auth_header or auth_header != target_header:
+        # Headers are decoded as latin-1, so encoding back is lossless; compare in constant time
+        if not auth_header or not hmac.compare_digest(auth_header.encode('latin-1'), target_header):
             self.send_response(401)
             self.send_header('WWW-Authenticate', 'Basic realm="Good-GYM Login"')
             self.send_header('Content-Type', 'text/html')
@@ -156,18 +195,21 @@ class AudioHTTPHandler(SimpleHTTPRequestHandler):
             return
         
         if self.path.endswith('vnc_audio.html'):
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-            self.send_header('Pragma', 'no-cache')
-            self.send_header('Expires', '0')
-            self.end_headers()
-            
             try:
-                with open(os.path.join(AUDIO_DIR, 'vnc_audio.html'), 'rb') as f:
-                    self.wfile.write(f.read())
-            except Exception as e:
-                pass # Should send error but here we just pass
+                f = open(os.path.join(AUDIO_DIR, 'vnc_audio.html'), 'rb')
+            except OSError:
+                self.send_error(404)
+                return
+            
+            with f:
+                self.send_response(200)
+                self.send_header('Content-type', 'text/html')
+                self.send_header('Content-Length', str(os.fstat(f.fileno()).st_size))
+                self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
+                self.send_header('Pragma', 'no-cache')
+                self.send_header('Expires', '0')
+                self.end_headers()
+                self.copyfile(f, self.wfile)
             return
             
         super().do_GET()
@@ -185,71 +227,219 @@ def run_http_server():
     except Exception as e:
         print(f"[AudioHTTP] ✗ HTTP服务器启动失败: {e}", flush=True)
 
-async def main():
-    """Main entry point"""
-    global event_loop
+# Connected browser clients
+_CONNECTED_CLIENTS = set()
+
+# Pre-serialized events for sounds broadcast without a count
+_KNOWN_SOUNDS = ('count', 'milestone', 'succeed')
+_NO_COUNT_TEMPLATES = {
+    name: json.dumps({"type": "play_audio", "sound": name}) for name in _KNOWN_SOUNDS
+}
+
+# Handshake frame sent to every new client
+_WELCOME_FRAME = json.dumps({"type": "connected", "message": "ok"})
+
+async def handle_client(websocket):
+    """Register a browser client and keep its connection open"""
+    _CONNECTED_CLIENTS.add(websocket)
+    print(f"[AudioWS] 客户端已连接 (当前{len(_CONNECTED_CLIENTS)}个)", flush=True)
+    try:
+        await websocket.send(_WELCOME_FRAME)
+        # One-way channel: drain inbound frames as raw bytes, skipping UTF-8 decoding
+        while True:
+            await websocket.recv(decode=False)
+    except websockets.exceptions.ConnectionClosed:
+        pass
+    finally:
+        _CONNECTED_CLIENTS.discard(websocket)
+        print(f"[AudioWS] 客户端已断开 (当前{len(_CONNECTED_CLIENTS)}个)", flush=True)
+
+async def broadcast_audio_event(sound_type, count=None):
+    """Broadcast an audio play event to all connected browsers"""
+    if not _CONNECTED_CLIENTS:
+        return
+    
+    if count is None and sound_type in _NO_COUNT_TEMPLATES:
+        message = _NO_COUNT_TEMPLATES[sound_type]
+    else:
+        payload = {"type": "play_audio", "sound": sound_type}
+        if count is not None:
+            payload["count"] = count
+        message = json.dumps(payload)
     
-    # Get the running event loop
-    event_loop = asyncio.get_running_loop()
+    await broadcast_prebuilt(message)
+
+async def broadcast_audio_batch(events):
+    """Broadcast several coalesced audio events to all browsers as one frame"""
+    if not _CONNECTED_CLIENTS:
+        return
+    
+    batch = []
+    for event in events:
+        item = {"sound": event.get('sound', 'count')}
+        if event.get('count') is not None:
+            item["count"] = event['count']
+        batch.append(item)
+    await broadcast_prebuilt(json.dumps({"type": "play_audio_batch", "events": batch}))
+
+async def broadcast_prebuilt(message):
+    """Send one already-serialized frame to every connected browser"""
+    # Send to all clients concurrently; total latency is the slowest client, not the sum
+    clients = list(_CONNECTED_CLIENTS)
+    results = await asyncio.gather(
+        *(client.send(message) for client in clients),
+        return_exceptions=True
+    )
+    stale_clients = [
+        client for client, result in zip(clients, results)
+        if isinstance(result, websockets.exceptions.ConnectionClosed)
+    ]
     
+    if stale_clients:
+        _CONNECTED_CLIENTS.difference_update(stale_clients)
+
+async def main():
+    """Main entry point"""
     # Start HTTP server in background thread
     http_thread = threading.Thread(target=run_http_server, daemon=True)
     http_thread.start()
     
-    # Start internal event listener in background thread
-    event_thread = threading.Thread(target=run_event_listener, daemon=True)
-    event_thread.start()
+    # Internal event listener runs on this loop, no extra thread
+    await start_event_listener()
     
     # Start WebSocket server
     print(f"[AudioWS] ✓ WebSocket服务器启动在端口 {AUDIO_WS_PORT}", flush=True)
     
-    async with websockets.serve(handle_client, "0.0.0.0", AUDIO_WS_PORT):
+    # 30s keepalive pings hold NAT/proxy paths open and reap dead browsers
+    async with websockets.serve(handle_client, "0.0.0.0", AUDIO_WS_PORT,
+                                ping_interval=30, ping_timeout=10,
+                                max_queue=32, max_size=64 * 1024):
         print(f"[AudioWS] ========== 服务器就绪 ==========", flush=True)
         await asyncio.Future()  # Run forever
 
 # Internal event listener for receiving events from SoundManager
-INTERNAL_EVENT_PORT = 8865
-event_loop = None
+# SoundManager keeps one stream connection open and writes binary event frames
+# (newline-delimited JSON still accepted); Unix domain socket where available, TCP otherwise
+INTERNAL_EVENT_SOCKET = '/tmp/goodgym_audio.sock'
+INTERNAL_EVENT_PORT = AUDIO_WS_PORT + 100  # 8865
+
+# Binary event frame, must match core/sound_manager.py:
+# header (magic, u16 event count) followed by one (sound id, u32 count) record per event;
+# EVENT_NO_COUNT marks an event without a count (a real count of 0 is sent as 0)
+EVENT_MAGIC = 0xA5
+EVENT_HEADER = struct.Struct("!BH")
+EVENT_RECORD = struct.Struct("!BI")
+EVENT_NO_COUNT = 0xFFFFFFFF
+SOUND_NAMES = ('count', 'milestone', 'succeed')
+_BROADCAST_TASKS = set()
 
-def run_event_listener():
-    """Run internal TCP listener for SoundManager events"""
-    global event_loop
+def _validated_event(event):
+    """(sound, count) from one JSON event, or None if its fields are malformed"""
+    if not isinstance(event, dict):
+        return None
+    sound = event.get('sound', 'count')
+    count = event.get('count')
+    if not isinstance(sound, str):
+        return None
+    if count is not None and (isinstance(count, bool) or not isinstance(count, int)):
+        return None
+    return sound, count
+
+def handle_event_data(data):
+    """Parse one newline-delimited JSON event (sounds without a binary id) and schedule the broadcast"""
+    data = data.strip()
+    if not data:
+        return
+    
+    print(f"[AudioEvent] 收到事件: {data.decode('utf-8', 'replace')}", flush=True)
+    try:
+        event_data = json_loads(data)
+    except ValueError:
+        return
+    if not isinstance(event_data, dict):
+        return
     
-    import socket
+    # Rebuild the browser message from the validated fields only, never forward the input
+    event_type = event_data.get('type')
+    if event_type == 'play_audio':
+        event = _validated_event(event_data)
+        if event is None:
+            return
+        coro = broadcast_audio_event(*event)
+    elif event_type == 'play_audio_batch':
+        raw_events = event_data.get('events')
+        if not isinstance(raw_events, list):
+            return
+        events = [e for e in map(_validated_event, raw_events) if e is not None]
+        if not events:
+            return
+        coro = broadcast_audio_batch([{'sound': sound, 'count': count} for sound, count in events])
+    else:
+        return
     
-    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    # Already on the event loop; keep a reference so the task isn't collected
+    task = asyncio.ensure_future(coro)
+    _BROADCAST_TASKS.add(task)
+    task.add_done_callback(_BROADCAST_TASKS.discard)
+
+def handle_event_frame(records):
+    """Schedule the broadcast for one decoded binary frame of (sound id, count) records"""
+    events = []
+    for offset in range(0, len(records), EVENT_RECORD.size):
+        sound_id, count = EVENT_RECORD.unpack_from(records, offset)
+        if sound_id < len(SOUND_NAMES):
+            events.append((SOUND_NAMES[sound_id], None if count == EVENT_NO_COUNT else count))
     
+    if not events:
+        return
+    print(f"[AudioEvent] 收到事件: {events}", flush=True)
+    if len(events) == 1:
+        coro = broadcast_audio_event(*events[0])
+    else:
+        coro = broadcast_audio_batch([{'sound': sound, 'count': count} for sound, count in events])
+    
+    # Already on the event loop; keep a reference so the task isn't collected
+    task = asyncio.ensure_future(coro)
+    _BROADCAST_TASKS.add(task)
+    task.add_done_callback(_BROADCAST_TASKS.discard)
+
+async def handle_event_connection(reader, writer):
+    """Read events from one SoundManager connection until EOF"""
     try:
-        server_socket.bind(('0.0.0.0', INTERNAL_EVENT_PORT))
-        server_socket.listen(5)
-        print(f"[AudioEvent] ✓ 内部事件监听器启动在端口 {INTERNAL_EVENT_PORT}", flush=True)
-        
         while True:
+            first = await reader.read(1)
+            if not first:
+                break
             try:
-                client_socket, addr = server_socket.accept()
-                data = client_socket.recv(1024).decode('utf-8')
-                client_socket.close()
-                
-                if data:
-                    print(f"[AudioEvent] 收到事件: {data}", flush=True)
-                    try:
-                        event_data = json.loads(data)
-                        if event_data.get('type') == 'play_audio':
-                            sound_type = event_data.get('sound', 'count')
-                            count = event_data.get('count')
-                            # Schedule broadcast in the async event loop
-                            if event_loop:
-                                asyncio.run_coroutine_threadsafe(
-                                    broadcast_audio_event(sound_type, count), 
-                                    event_loop
-                                )
-                    except json.JSONDecodeError:
-                        pass
-                        
+                if first[0] == EVENT_MAGIC:
+                    _, n_events = EVENT_HEADER.unpack(first + await reader.readexactly(EVENT_HEADER.size - 1))
+                    handle_event_frame(await reader.readexactly(n_events * EVENT_RECORD.size))
+                else:
+                    handle_event_data(first + await reader.readline())
+            except asyncio.IncompleteReadError:
+                break
             except Exception as e:
                 print(f"[AudioEvent] 处理错误: {e}", flush=True)
-                
+    except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+        print(f"[AudioEvent] 连接错误: {e}", flush=True)
+    finally:
+        writer.close()
+
+async def start_event_listener():
+    """Start the internal event listener on the running event loop"""
+    # Unix socket for same-host senders, TCP on all interfaces alongside it for everything else
+    if hasattr(socket, 'AF_UNIX'):
+        try:
+            # Remove a stale socket file left by a previous run
+            if os.path.exists(INTERNAL_EVENT_SOCKET):
+                os.unlink(INTERNAL_EVENT_SOCKET)
+            await asyncio.start_unix_server(handle_event_connection, path=INTERNAL_EVENT_SOCKET)
+            print(f"[AudioEvent] ✓ 内部事件监听器启动在 {INTERNAL_EVENT_SOCKET}", flush=True)
+        except Exception as e:
+            print(f"[AudioEvent] ✗ Unix 监听器启动失败: {e}", flush=True)
+    try:
+        await asyncio.start_server(handle_event_connection, '0.0.0.0', INTERNAL_EVENT_PORT)
+        print(f"[AudioEvent] ✓ 内部事件监听器启动在端口 {INTERNAL_EVENT_PORT}", flush=True)
     except Exception as e:
         print(f"[AudioEvent] ✗ 监听器启动失败: {e}", flush=True)
 
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exercise definitions for Good-GYM
+Locates data/exercises.json and caches its parsed 'exercises' section for all panels
+"""
+
+import logging
+import os
+import sys
+
+from core.json_utils import json_loads
+
+logger = logging.getLogger(__name__)
+
+# Resolved exercises.json path; frozen/_MEIPASS/Docker layout can't change within a process
+_exercises_path = None
+# (path, st_mtime_ns, parsed 'exercises' section); a single entry shared by every reader
+_exercises_cache = None
+
+
+def get_exercises_file_path():
+    """Get exercises.json file path, compatible with development and packaged environments"""
+    global _exercises_path
+    if _exercises_path is None:
+        _exercises_path = _resolve_exercises_file_path()
+    return _exercises_path
+
+
+def _resolve_exercises_file_path():
+    """Probe the candidate locations for exercises.json"""
+    if getattr(sys, 'frozen', False):
+        # Packaged environment
+        # First check for external data folder next to exe (user editable)
+        exe_dir = os.path.dirname(sys.executable)
+        external_file = os.path.join(exe_dir, 'data', 'exercises.json')
+        if os.path.exists(external_file):
+            return external_file
+        # Fall back to bundled data inside exe
+        base_path = getattr(sys, '_MEIPASS', None)
+        if base_path:
+            return os.path.join(base_path, 'data', 'exercises.json')
+    else:
+        # Development or Docker environment
+        # First try absolute path for Docker container
+        docker_path = '/app/data/exercises.json'
+        if os.path.exists(docker_path):
+            logger.info("[运动数据] 使用Docker路径: %s", docker_path)
+            return docker_path
+
+    # Fall back to relative path for local development; made absolute so the
+    # cached path stays valid if the working directory changes later
+    return os.path.abspath(os.path.join('data', 'exercises.json'))
+
+
+def load_exercises(path=None):
+    """Return the parsed 'exercises' section of exercises.json, reparsing only when its mtime changes
+
+    The returned dict is shared: callers must not mutate it. Raises OSError/ValueError
+    if the file is missing or malformed.
+    """
+    global _exercises_cache
+    if path is None:
+        path = get_exercises_file_path()
+    mtime = os.stat(path).st_mtime_ns
+    cached = _exercises_cache
+    if cached is not None and cached[0] == path and cached[1] == mtime:
+        return cached[2]
+    with open(path, 'rb') as f:
+        exercises = json_loads(f.read()).get('exercises', {})
+    _exercises_cache = (path, mtime, exercises)
+    return exercises
+
+
+def preload_exercises():
+    """Parse exercises.json during startup so the first panel doesn't pay for it"""
+    try:
+        load_exercises()
+    except (OSError, ValueError) as e:
+        logger.warning("[运动数据] 预加载运动类型文件失败: %s", e)
@@ -1,30 +1,95 @@
 import requests
 import json
+import logging
+import re
+import threading
+from types import MappingProxyType
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Any, Optional
 
+logger = logging.getLogger(__name__)
+
+
+# 模板变量占位符，如 {count}
+_VAR_PATTERN = re.compile(r"\{(\w+)\}")
+
+
 class HAAPIManager:
     """Home Assistant API管理器"""
     
+    # 保活间隔（秒），略短于HA的keep-alive超时
+    KEEPALIVE_INTERVAL = 25
+    
     def __init__(self, base_url: str = "", token: str = ""):
         self.base_url = base_url.rstrip('/')
         self.token = token
-        self.headers = {
+        self._headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json"
         }
+        # 只读视图，防止外部误改；内部通过 _headers 更新
+        self.headers = MappingProxyType(self._headers)
         self.timeout = 5  # 5秒超时
+        
+        # 长连接会话，复用TCP/TLS连接，避免每次调用重新握手
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                              max_retries=Retry(total=1, backoff_factor=0.1))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # 预热/保活线程，首次 prewarm() 时启动
+        self._keepalive_thread = None
+        self._keepalive_stop = threading.Event()
     
-    def update_config(self, base_url: str, token: str):
-        """更新配置"""
+    def update_config(self, base_url: str, token: str, prewarm: bool = False):
+        """更新配置（prewarm=True时同时预热连接并启动保活）"""
         self.base_url = base_url.rstrip('/')
         self.token = token
-        self.headers["Authorization"] = f"Bearer {token}"
+        self._headers["Authorization"] = f"Bearer {token}"
+        self.session.headers["Authorization"] = self.headers["Authorization"]
+        if prewarm:
+            self.prewarm()
+    
+    def prewarm(self):
+        """后台建立连接并保持连接池温热，首次播报不再承担TCP/TLS握手延迟"""
+        if not self.base_url:
+            return
+        threading.Thread(target=self.test_connection, daemon=True).start()
+        if self._keepalive_thread is None:
+            # 每个保活线程有自己的停止事件，停止后可再次启动
+            self._keepalive_stop = threading.Event()
+            self._keepalive_thread = threading.Thread(target=self._keepalive_loop,
+                                                      args=(self._keepalive_stop,), daemon=True)
+            self._keepalive_thread.start()
+    
+    def stop_keepalive(self):
+        """停止保活线程（离开HA模式时调用），之后prewarm()可重新启动"""
+        self._keepalive_stop.set()
+        self._keepalive_thread = None
+    
+    def _keepalive_loop(self, stop):
+        """定期 HEAD /api/，防止空闲连接被服务端关闭"""
+        while not stop.wait(self.KEEPALIVE_INTERVAL):
+            if not self.base_url:
+                continue
+            try:
+                self.session.head(f"{self.base_url}/api/", timeout=self.timeout)
+            except requests.exceptions.RequestException:
+                pass
+    
+    def close(self):
+        """停止保活并关闭连接池"""
+        self.stop_keepalive()
+        self.session.close()
     
     def test_connection(self) -> tuple[bool, str]:
         """测试HA连接"""
         try:
             url = f"{self.base_url}/api/"
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout)
             
             if response.status_code == 200:
                 data = response.json()
@@ -54,18 +119,15 @@ class HAAPIManager:
         try:
             url = f"{self.base_url}{service_path}"
             
-            # 合并headers
-            headers = self.headers.copy()
-            if custom_headers:
-                headers.update(custom_headers)
-            
-            print(f"[HA API] POST {url}")
-            print(f"[HA API] Data: {json.dumps(data, ensure_ascii=False)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[HA API] POST %s", url)
+                logger.debug("[HA API] Data: %s", json.dumps(data, ensure_ascii=False))
             
-            response = requests.post(
+            # 会话已带默认headers，自定义headers由requests按请求合并
+            response = self.session.post(
                 url, 
                 json=data, 
-                headers=headers, 
+                headers=custom_headers, 
                 timeout=self.timeout
             )
             
@@ -92,11 +154,12 @@ class HAAPIManager:
         Returns:
             替换后的字符串
         """
-        result = template
-        for key, value in variables.items():
-            placeholder = f"{{{key}}}"
-            result = result.replace(placeholder, str(value))
-        return result
+        return self._format_template(template, {k: str(v) for k, v in variables.items()})
+    
+    def _format_template(self, template: str, str_variables: Dict[str, str]) -> str:
+        """单次正则替换 {变量}；未知变量和其他花括号保留原样"""
+        return _VAR_PATTERN.sub(
+            lambda m: str_variables.get(m.group(1), m.group(0)), template)
     
     def prepare_body_with_variables(self, body_params: list, variables: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -110,6 +173,7 @@ class HAAPIManager:
             处理后的请求体字典
         """
         body = {}
+        str_variables = None  # 变量只转换一次字符串，多个参数共用
         for param in body_params:
             if not param.get('enabled', True):
                 continue
@@ -121,7 +185,9 @@ class HAAPIManager:
             
             # 字符串类型且需要替换变量
             if param_type == 'string' and use_variables and isinstance(value, str):
-                value = self.replace_variables(value, variables)
+                if str_variables is None:
+                    str_variables = {k: str(v) for k, v in variables.items()}
+                value = self._format_template(value, str_variables)
             
             body[key] = value
         
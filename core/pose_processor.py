@@ -1,17 +1,67 @@
 import os
 import cv2
 import sys
+import time
+import threading
+import weakref
 import numpy as np
 import json
+import logging
 import mediapipe as mp
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 
+logger = logging.getLogger(__name__)
+
+class _SharedDetector:
+    """同一模型版本共享的检测器及其引用计数"""
+    
+    def __init__(self):
+        self.detector = None
+        self.refcount = 0
+        # 当前接收检测结果的处理器（弱引用），LIVE_STREAM 回调按它转发
+        self.owner = None
+        # 时间戳对同一个 detector 必须严格单调递增，所以跟随 detector 保存
+        self.last_timestamp_ms = 0
+    
+    def dispatch(self, result, output_image, timestamp_ms):
+        processor = self.owner() if self.owner is not None else None
+        if processor is not None:
+            processor._on_result(result, output_image, timestamp_ms)
+
+
 class PoseProcessor:
     """MediaPipe 姿态检测处理器"""
     
+    # 检测结果超过该时长未返回时，视为丢失并重新提交（秒）
+    PENDING_TIMEOUT = 1.0
+    
+    # MediaPipe Pose 关键点数量
+    NUM_LANDMARKS = 33
+    
+    # 设置 GOODGYM_MEDIAPIPE_GPU=1 时尝试 GPU delegate（需要 OpenGL ES），失败自动回退 CPU/XNNPACK
+    USE_GPU_DELEGATE = os.environ.get('GOODGYM_MEDIAPIPE_GPU', '0') == '1'
+    
+    # 按模型版本缓存检测器并计数引用，重复创建处理器时不再重新加载模型
+    _detector_cache = {}
+    _cache_lock = threading.Lock()
+    
     def __init__(self, exercise_counter, model_version='lite'):
         self.exercise_counter = exercise_counter
+        
+        # 运动类型 -> 计数方法，只构建一次，逐帧直接查表
+        self._count_methods = {
+            "squat": exercise_counter.count_squat,
+            "pushup": exercise_counter.count_pushup,
+            "situp": exercise_counter.count_situp,
+            "bicep_curl": exercise_counter.count_bicep_curl,
+            "lateral_raise": exercise_counter.count_lateral_raise,
+            "overhead_press": exercise_counter.count_overhead_press,
+            "leg_raise": exercise_counter.count_leg_raise,
+            "knee_raise": exercise_counter.count_knee_raise,
+            "knee_press": exercise_counter.count_knee_press,
+            "crunch": exercise_counter.count_crunch
+        }
         self.show_skeleton = True
         self.conf_threshold = 0.5
         self.model_version = model_version
@@ -20,33 +70,101 @@ class PoseProcessor:
         print(f"Initializing MediaPipe Pose Landmarker ({model_version} model)...")
         
         try:
-            # 获取模型文件路径
-            model_path = self.get_model_path(model_version)
-            
-            # 创建基础选项（使用模型文件）
-            base_options = python.BaseOptions(model_asset_path=model_path)
-            
-            # 创建姿态检测选项
-            options = vision.PoseLandmarkerOptions(
-                base_options=base_options,
-                running_mode=vision.RunningMode.IMAGE,
-                num_poses=1,
-                min_pose_detection_confidence=0.5,
-                min_pose_presence_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
-            
-            self.detector = vision.PoseLandmarker.create_from_options(options)
-            print(f"MediaPipe Pose initialized successfully with model: {model_path}")
+            self._shared = self._acquire_detector(model_version)
+            self.detector = self._shared.detector
         except Exception as e:
             print(f"Failed to initialize MediaPipe Pose: {e}")
             raise
         
-        # 帧计数器（用于 VIDEO 模式的时间戳）
+        # 帧计数器（用于性能日志）
         self.frame_counter = 0
         
+        # 异步检测状态，由 _result_lock 保护（回调在 MediaPipe 内部线程执行）
+        self._result_lock = threading.Lock()
+        self._latest_result = None  # (result, 图像宽, 图像高, 缩放比例)
+        self._pending = False
+        self._pending_scale = 1.0
+        self._submit_time = 0.0
+        self._detect_time = 0.0
+        
+        # 最近一次检测的输出 (角度, 角度点, 关键点)，无新结果时复用
+        self._last_output = (None, None, None)
+        
+        # 关键点预分配缓冲区，每帧原地填充，避免逐帧分配
+        # 注意：返回的 keypoints 即该缓冲区，在下一次检测结果到来时被覆盖
+        self._xy_flat = np.empty(self.NUM_LANDMARKS * 2, dtype=np.float32)
+        self._kp_buf = np.empty((self.NUM_LANDMARKS, 2), dtype=np.float32)
+        
+        # 帧预处理缓冲区（缩放 / RGB），按输入尺寸懒分配，分辨率不变时逐帧复用
+        # cv2 的 dst 必须是连续内存，所以按实际尺寸分配而不是切片大缓冲区
+        self._resize_buf = None
+        self._rgb_buf = None
+        
         # 加载运动配置用于角度点
         self.exercise_configs = self.load_exercise_configs()
+        
+        # 运动类型 -> 角度点索引数组（仅保留有效的 3 点配置）
+        self._angle_idx = {
+            exercise_type: config['angle_point_idx']
+            for exercise_type, config in self.exercise_configs.items()
+            if len(config['angle_point_idx']) == 3
+        }
+        
+        # 状态就绪后再接管共享检测器的结果回调（最后创建的处理器接收结果）
+        self._shared.owner = weakref.ref(self)
+    
+    def _acquire_detector(self, model_version):
+        """从缓存获取（或创建）该模型版本的检测器，引用计数 +1"""
+        with self._cache_lock:
+            shared = self._detector_cache.get(model_version)
+            if shared is None:
+                # 获取模型文件路径
+                model_path = self.get_model_path(model_version)
+                
+                # LIVE_STREAM 模式：推理与下一帧的预处理重叠
+                # 回调经共享对象按弱引用转发，避免 detector 持有处理器形成循环引用
+                shared = _SharedDetector()
+                shared.detector = self._create_detector(model_path, shared.dispatch)
+                self._detector_cache[model_version] = shared
+                print(f"MediaPipe Pose initialized successfully with model: {model_path}")
+            else:
+                print(f"[PoseProcessor] 复用已加载的 {model_version} 模型")
+            shared.refcount += 1
+            return shared
+    
+    def _release_detector(self):
+        """引用计数 -1，归零时关闭并移出缓存"""
+        with self._cache_lock:
+            shared = self._shared
+            shared.refcount -= 1
+            if shared.owner is not None and shared.owner() in (self, None):
+                shared.owner = None
+            if shared.refcount <= 0:
+                self._detector_cache.pop(self.model_version, None)
+                shared.detector.close()
+    
+    def _create_detector(self, model_path, result_callback):
+        """创建检测器；启用 GPU 时先探测 GPU delegate，不可用则回退 CPU"""
+        delegates = [python.BaseOptions.Delegate.CPU]
+        if self.USE_GPU_DELEGATE:
+            delegates.insert(0, python.BaseOptions.Delegate.GPU)
+        
+        for delegate in delegates:
+            options = vision.PoseLandmarkerOptions(
+                base_options=python.BaseOptions(model_asset_path=model_path, delegate=delegate),
+                running_mode=vision.RunningMode.LIVE_STREAM,
+                num_poses=1,
+                min_pose_detection_confidence=0.5,
+                min_pose_presence_confidence=0.5,
+                min_tracking_confidence=0.5,
+                result_callback=result_callback
+            )
+            try:
+                return vision.PoseLandmarker.create_from_options(options)
+            except Exception as e:
+                if delegate == delegates[-1]:
+                    raise
+                print(f"[PoseProcessor] GPU delegate 不可用，回退到 CPU: {e}")
     
     def get_model_path(self, model_version='lite'):
         """获取模型文件路径，支持lite/full/heavy版本"""
@@ -109,8 +227,10 @@ class PoseProcessor:
                     # 提取每个运动的 angle_point
                     configs = {}
                     for exercise_type, config in exercises.items():
+                        angle_point = config.get('angle_point', [])
                         configs[exercise_type] = {
-                            'angle_point': config.get('angle_point', [])
+                            'angle_point': angle_point,
+                            'angle_point_idx': np.asarray(angle_point, dtype=np.intp)
                         }
                     
                     return configs
@@ -122,72 +242,128 @@ class PoseProcessor:
             print(f"加载运动配置时出错：{e}")
             return {}
     
+    def _on_result(self, result, output_image, timestamp_ms):
+        """LIVE_STREAM 结果回调，只保存最新结果"""
+        with self._result_lock:
+            self._latest_result = (result, output_image.width, output_image.height, self._pending_scale)
+            self._detect_time = time.monotonic() - self._submit_time
+            self._pending = False
+    
     def process_frame(self, frame, exercise_type):
-        """处理单帧进行姿态检测和运动计数"""
-        import time
-        start_time = time.time()
+        """处理单帧进行姿态检测和运动计数
+        
+        检测异步进行：提交当前帧后立即消费已完成的最新结果。
+        若上一帧仍在检测中则跳过提交（自适应跳帧）。
+        """
+        start_time = time.monotonic()
+        self.frame_counter += 1
+        
+        # 取出已完成的结果，并判断检测器是否空闲
+        with self._result_lock:
+            ready = self._latest_result
+            self._latest_result = None
+            busy = self._pending and (start_time - self._submit_time) < self.PENDING_TIMEOUT
+        
+        if not busy:
+            self._submit_frame(frame)
+        
+        if ready is not None:
+            self._last_output = self._handle_result(ready, exercise_type)
+        
+        # 每60帧记录一次性能日志；日志级别未开启时不做计时和格式化
+        if self.frame_counter % 60 == 0 and logger.isEnabledFor(logging.INFO):
+            total_time = time.monotonic() - start_time
+            logger.info("[性能] Frame #%d: 总耗时 %.1fms | 检测: %.1fms",
+                        self.frame_counter, total_time * 1000, self._detect_time * 1000)
+        
+        current_angle, angle_point, keypoints = self._last_output
+        # 返回处理后的帧、当前角度、角度点和关键点
+        return None, current_angle, angle_point, keypoints
+    
+    def _submit_frame(self, frame):
+        """预处理帧并异步提交给检测器"""
         # 大小检查，如果帧太大则调整大小
         h, w = frame.shape[:2]
-        original_size = (w, h)
         
         # MediaPipe 适合中等分辨率，限制以提高性能
         if w > 640 or h > 640:
-            scale = min(640/w, 640/h)
-            frame = cv2.resize(frame, (int(w*scale), int(h*scale)))
-            scale_factor = scale
+            scale_factor = min(640/w, 640/h)
+            nw, nh = int(w*scale_factor), int(h*scale_factor)
         else:
             scale_factor = 1.0
-        
-        # 初始化结果
-        current_angle = None
-        angle_point = None
-        keypoints = None
+            nw, nh = w, h
         
         try:
+            resize_buf, rgb_buf = self._frame_buffers(nh, nw)
+            
+            if scale_factor < 1.0:
+                # 缩小 2 倍以上用 INTER_AREA 抗混叠，否则双线性即可
+                interpolation = cv2.INTER_AREA if scale_factor <= 0.5 else cv2.INTER_LINEAR
+                frame = cv2.resize(frame, (nw, nh), dst=resize_buf, interpolation=interpolation)
+            
             # 转换为 RGB (MediaPipe 需要)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # frame[:, :, ::-1] 是非连续视图，mp.Image 不接受，所以仍写入预分配的连续缓冲区；
+            # 采集端保持 BGR，因为绘制和显示整条链路都按 BGR 处理
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_buf)
             
             # 创建 MediaPipe Image 对象
+            # mp.Image 会拷贝像素数据、不持有 frame_rgb 的引用，缓冲区可在下一帧直接复用
             mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame_rgb)
             
-            # 处理帧
-            self.frame_counter += 1
-            timestamp_ms = self.frame_counter * 33  # 假设 ~30 FPS
-            
-            # 使用 IMAGE 模式检测
-            detect_start = time.time()
-            detection_result = self.detector.detect(mp_image)
-            detect_time = time.time() - detect_start
-            
-            # 提取关键点
-            if detection_result.pose_landmarks:
-                # 获取第一个人的关键点
-                landmarks = detection_result.pose_landmarks[0]
-                h, w = frame.shape[:2]
-                
-                # 转换为 numpy 数组 (33个关键点, x, y)
-                keypoints = np.array([[lm.x * w, lm.y * h] for lm in landmarks])
-                
-                # 如果需要缩放回原始大小
-                if scale_factor != 1.0:
-                    keypoints = keypoints / scale_factor
-                
-                # 调用计数器进行计数（这会更新counter和stage）
-                current_angle = self.exercise_counter.count_exercise(keypoints, exercise_type)
-                
-                # 根据运动类型获取对应的角度点用于可视化
-                _, angle_point = self.get_exercise_angle(keypoints, exercise_type)
+            # LIVE_STREAM 要求时间戳严格单调递增，跳帧不影响
+            timestamp_ms = max(time.monotonic_ns() // 1_000_000, self._shared.last_timestamp_ms + 1)
+            self._shared.last_timestamp_ms = timestamp_ms
             
+            with self._result_lock:
+                self._pending = True
+                self._pending_scale = scale_factor
+                self._submit_time = time.monotonic()
+            self.detector.detect_async(mp_image, timestamp_ms)
         except Exception as e:
+            with self._result_lock:
+                self._pending = False
             print(f"MediaPipe 处理失败：{e}")
+    
+    def _frame_buffers(self, nh, nw):
+        """返回 (nh, nw) 尺寸的缩放/RGB 缓冲区，尺寸变化时重新分配"""
+        if self._rgb_buf is None or self._rgb_buf.shape[:2] != (nh, nw):
+            self._resize_buf = np.empty((nh, nw, 3), dtype=np.uint8)
+            self._rgb_buf = np.empty_like(self._resize_buf)
+        return self._resize_buf, self._rgb_buf
+    
+    def _handle_result(self, ready, exercise_type):
+        """从检测结果提取关键点并计数，返回 (角度, 角度点, 关键点)"""
+        detection_result, w, h, scale_factor = ready
         
-        total_time = time.time() - start_time
-        # 每60帧打印一次性能日志（降低日志频率）
-        if self.frame_counter % 60 == 0:
-            print(f"[性能] Frame #{self.frame_counter}: 总耗时 {total_time*1000:.1f}ms | 检测: {detect_time*1000:.1f}ms")
+        # 未检测到人体
+        if not detection_result.pose_landmarks:
+            return None, None, None
         
-        # 返回处理后的帧、当前角度、角度点和关键点
-        return None, current_angle, angle_point, keypoints
+        try:
+            # 获取第一个人的关键点
+            landmarks = detection_result.pose_landmarks[0]
+            
+            # 填充到预分配缓冲区 (33个关键点, x, y)，再一次性向量化缩放到像素坐标
+            xy = self._xy_flat
+            xy[0::2] = [lm.x for lm in landmarks]
+            xy[1::2] = [lm.y for lm in landmarks]
+            keypoints = self._kp_buf
+            np.multiply(xy.reshape(self.NUM_LANDMARKS, 2), (w, h), out=keypoints)
+            
+            # 如果需要缩放回原始大小（原地缩放）
+            if scale_factor != 1.0:
+                keypoints *= 1.0 / scale_factor
+            
+            # 调用计数器进行计数（这会更新counter和stage）
+            current_angle = self.exercise_counter.count_exercise(keypoints, exercise_type)
+            
+            # 根据运动类型获取对应的角度点用于可视化
+            _, angle_point = self.get_exercise_angle(keypoints, exercise_type)
+            
+            return current_angle, angle_point, keypoints
+        except Exception as e:
+            print(f"MediaPipe 处理失败：{e}")
+            return None, None, None
     
     def get_exercise_angle(self, keypoints, exercise_type):
         """根据运动类型获取角度"""
@@ -195,34 +371,17 @@ class PoseProcessor:
         angle_point = None
         
         try:
-            # 根据运动类型获取计数方法
-            count_method_map = {
-                "squat": self.exercise_counter.count_squat,
-                "pushup": self.exercise_counter.count_pushup,
-                "situp": self.exercise_counter.count_situp,
-                "bicep_curl": self.exercise_counter.count_bicep_curl,
-                "lateral_raise": self.exercise_counter.count_lateral_raise,
-                "overhead_press": self.exercise_counter.count_overhead_press,
-                "leg_raise": self.exercise_counter.count_leg_raise,
-                "knee_raise": self.exercise_counter.count_knee_raise,
-                "knee_press": self.exercise_counter.count_knee_press,
-                "crunch": self.exercise_counter.count_crunch
-            }
-            
             # 获取计数方法
-            count_method = count_method_map.get(exercise_type)
+            count_method = self._count_methods.get(exercise_type)
             if count_method:
                 current_angle = count_method(keypoints)
                 
-                # 从配置获取 angle_point
-                if current_angle is not None and exercise_type in self.exercise_configs:
-                    angle_point_indices = self.exercise_configs[exercise_type].get('angle_point', [])
-                    if len(angle_point_indices) == 3:
-                        angle_point = [
-                            keypoints[angle_point_indices[0]],
-                            keypoints[angle_point_indices[1]],
-                            keypoints[angle_point_indices[2]]
-                        ]
+                # 从缓存的配置获取 angle_point
+                if current_angle is not None:
+                    angle_point_indices = self._angle_idx.get(exercise_type)
+                    if angle_point_indices is not None:
+                        # 一次花式索引得到 (3, 2) 数组（副本，不随关键点缓冲区被覆盖）
+                        angle_point = keypoints[angle_point_indices]
         except Exception as e:
             print(f"计算运动角度时出错：{e}")
             
@@ -235,5 +394,5 @@ class PoseProcessor:
     
     def __del__(self):
         """清理资源"""
-        if hasattr(self, 'detector'):
-            self.detector.close()
+        if hasattr(self, '_shared'):
+            self._release_detector()
@@ -1,49 +1,134 @@
 import os
 import sys
+import time
+import functools
+import itertools
+import concurrent.futures
+import shutil
+import queue
 import subprocess
 import threading
 import socket
-import json
-from PyQt5.QtCore import QUrl, QObject
+import struct
+from PyQt5.QtCore import QUrl, QObject, QByteArray, QBuffer, QIODevice
 from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
 
+from core.json_utils import json_dumps
+
+# Binary event frame understood by audio_ws_server.py (constants must match there):
+# header (magic, u16 event count) followed by one (sound id, u32 count) record per event;
+# EVENT_NO_COUNT marks an event without a count (a real count of 0 is sent as 0)
+EVENT_MAGIC = 0xA5
+EVENT_HEADER = struct.Struct("!BH")
+EVENT_RECORD = struct.Struct("!BI")
+EVENT_NO_COUNT = 0xFFFFFFFF
+EVENT_MAX_BATCH = 0xFFFF  # largest event count the header can carry
+SOUND_IDS = {'count': 0, 'milestone': 1, 'succeed': 2}
+
+_BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_DOCKER_ASSETS = '/app/assets'
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_assets():
+    """Locate the assets directory once per process
+    
+    Returns (assets_dir, in_docker, frozenset of file names in it).
+    """
+    in_docker = os.path.isdir(_DOCKER_ASSETS)
+    assets_dir = _DOCKER_ASSETS if in_docker else os.path.join(_BASE_DIR, "assets")
+    try:
+        with os.scandir(assets_dir) as entries:
+            names = frozenset(entry.name for entry in entries)
+    except OSError:
+        names = frozenset()
+    return assets_dir, in_docker, names
+
 class SoundManager(QObject):
     """Sound effect management class for playing various notification sounds
     
     In Docker environment, also sends WebSocket events for browser audio playback.
     """
     
+    # Per-event logging on the count path, off unless GOODGYM_DEBUG=1
+    DEBUG = os.environ.get("GOODGYM_DEBUG") == "1"
+    
     # WebSocket server settings
     WS_HOST = 'localhost'
     WS_PORT = 8765
+    # Internal event socket exposed by audio_ws_server.py (TCP port on non-Unix hosts)
+    EVENT_SOCKET_PATH = '/tmp/goodgym_audio.sock'
+    EVENT_PORT = WS_PORT + 100  # 8865
+    # Reconnect backoff bounds (seconds) after the event server is unreachable
+    RECONNECT_MIN_DELAY = 0.5
+    RECONNECT_MAX_DELAY = 30.0
+    # Events arriving within this window are coalesced into one batch payload
+    BATCH_WINDOW_MS = 30
+    
+    # Desktop: count sounds rotate through this many preloaded players so overlapping reps
+    # don't cut each other off (QSoundEffect would be lighter but only plays WAV)
+    COUNT_PLAYER_RING = 4
+    
+    # Milestone sound plays on every Nth rep
+    MILESTONE_INTERVAL = 10
+    
+    # Local playback: mp3s are decoded once to raw PCM and streamed into long-lived players,
+    # one per sound that may play at the same time (a pipe write lasts about as long as the sound)
+    PCM_SINKS = 2
+    PCM_RATE = 44100
+    PCM_CHANNELS = 2
+    RAW_SINK_COMMANDS = {
+        'paplay': ['paplay', '--raw', '--format=s16le', f'--rate={PCM_RATE}', f'--channels={PCM_CHANNELS}'],
+        'aplay': ['aplay', '-q', '-t', 'raw', '-f', 'S16_LE', '-r', str(PCM_RATE), '-c', str(PCM_CHANNELS)],
+        'ffplay': ['ffplay', '-nodisp', '-loglevel', 'quiet', '-f', 's16le', '-ar', str(PCM_RATE),
+                   '-ac', str(PCM_CHANNELS), '-i', 'pipe:0'],
+    }
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.use_docker = False
         self.use_websocket = False
         self.audio_tool = None
+        # Specialized play functions, bound by init_sounds(); silent until then
+        self._play_count = self._play_milestone = self._play_succeed = lambda count=None: None
+        # One event connection reused for the whole session, owned by a single writer thread
+        self._event_sock = None
+        self._event_queue = queue.Queue(maxsize=64)
+        self._event_writer = None
+        self._reconnect_delay = 0.0
+        self._next_connect_time = 0.0
+        # Decoded PCM per sound file and the persistent raw-PCM player processes
+        self._pcm_cache = {}
+        self._audio_sink = None
+        self._audio_procs = [None] * self.PCM_SINKS
+        # Held by the worker streaming into that player for the length of the write
+        self._sink_busy = [threading.Lock() for _ in range(self.PCM_SINKS)]
+        # Guards only the process bookkeeping (_audio_procs, _active_procs, _closed), never a write
+        self._audio_lock = threading.Lock()
+        self._closed = False
+        # Fixed pool for local playback instead of a new thread per sound
+        self._play_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="sound")
+        # Fallback per-sound player processes still running; reaped without blocking
+        self._active_procs = []
         self.init_sounds()
     
     def init_sounds(self):
         """Initialize all sound effects"""
         try:
-            print("[SoundManager] ========== 初始化音效管理器 ==========", flush=True)
+            assets_dir, in_docker, asset_names = _resolve_assets()
             
-            # Set paths for various sound effects
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            print(f"[SoundManager] 基础目录: {base_dir}", flush=True)
+            # Collect the startup report and write it out once instead of flushing per line
+            lines = ["[SoundManager] ========== 初始化音效管理器 ==========",
+                     f"[SoundManager] 基础目录: {_BASE_DIR}"]
             
             # Check for Docker environment
-            docker_assets = '/app/assets'
-            if os.path.exists(docker_assets):
-                print(f"[SoundManager] ✓ Docker环境检测到", flush=True)
-                assets_dir = docker_assets
+            if in_docker:
+                lines.append(f"[SoundManager] ✓ Docker环境检测到")
                 self.use_docker = True
                 # Enable WebSocket for browser audio
                 self.use_websocket = True
             else:
-                assets_dir = os.path.join(base_dir, "assets")
-                print(f"[SoundManager] 使用本地资源路径: {assets_dir}", flush=True)
+                lines.append(f"[SoundManager] 使用本地资源路径: {assets_dir}")
                 self.use_docker = False
                 self.use_websocket = False
             
@@ -51,23 +136,33 @@ class SoundManager(QObject):
             self.succeed_sound_path = os.path.join(assets_dir, "succeed.mp3")
             self.milestone_sound_path = os.path.join(assets_dir, "milestone.mp3")
             
-            # Verify files exist and log
-            self.count_file_exists = os.path.exists(self.count_sound_path)
-            self.succeed_file_exists = os.path.exists(self.succeed_sound_path)
-            self.milestone_file_exists = os.path.exists(self.milestone_sound_path)
+            # Verify files exist (one directory scan, cached) and log
+            self.count_file_exists = "count.mp3" in asset_names
+            self.succeed_file_exists = "succeed.mp3" in asset_names
+            self.milestone_file_exists = "milestone.mp3" in asset_names
             
-            print(f"[SoundManager] 音效文件状态:", flush=True)
-            print(f"  - count.mp3: {'✓存在' if self.count_file_exists else '✗不存在'}", flush=True)
-            print(f"  - succeed.mp3: {'✓存在' if self.succeed_file_exists else '✗不存在'}", flush=True)
-            print(f"  - milestone.mp3: {'✓存在' if self.milestone_file_exists else '✗不存在'}", flush=True)
+            lines.append(f"[SoundManager] 音效文件状态:")
+            lines.append(f"  - count.mp3: {'✓存在' if self.count_file_exists else '✗不存在'}")
+            lines.append(f"  - succeed.mp3: {'✓存在' if self.succeed_file_exists else '✗不存在'}")
+            lines.append(f"  - milestone.mp3: {'✓存在' if self.milestone_file_exists else '✗不存在'}")
+            print("\n".join(lines), flush=True)
             
             # Initialize audio based on environment
             if self.use_docker:
                 self._check_audio_tools()
+                self._preload_pcm()
                 print(f"[SoundManager] WebSocket音频: {'✓启用' if self.use_websocket else '✗禁用'}", flush=True)
             else:
                 self.init_sound_players()
             
+            # Resolve the Docker/desktop branching once into per-sound play functions
+            self._play_count = self._build_player('count', self.count_sound_path,
+                                                  self.count_file_exists, 'count_sounds')
+            self._play_milestone = self._build_player('milestone', self.milestone_sound_path,
+                                                      self.milestone_file_exists, 'milestone_player')
+            self._play_succeed = self._build_player('succeed', self.succeed_sound_path,
+                                                    self.succeed_file_exists, 'succeed_player')
+            
             print("[SoundManager] ========== 音效管理器初始化完成 ==========", flush=True)
             
         except Exception as e:
@@ -78,78 +173,306 @@ class SoundManager(QObject):
     
     def _check_audio_tools(self):
         """Check which audio playback tool is available"""
-        self.audio_tool = None
-        tools = ['ffplay', 'mpv', 'paplay', 'aplay']
-        
-        for tool in tools:
-            try:
-                result = subprocess.run(['which', tool], capture_output=True, text=True)
-                if result.returncode == 0:
-                    self.audio_tool = tool
-                    print(f"[SoundManager] ✓ 本地播放工具: {tool}", flush=True)
-                    break
-            except:
-                pass
+        # shutil.which scans PATH in-process instead of spawning `which` per tool
+        self.audio_tool = next(
+            (tool for tool in ('ffplay', 'mpv', 'paplay', 'aplay') if shutil.which(tool)), None
+        )
         
-        if not self.audio_tool:
+        if self.audio_tool:
+            print(f"[SoundManager] ✓ 本地播放工具: {self.audio_tool}", flush=True)
+        else:
             print("[SoundManager] ⚠ 未找到本地音频播放工具", flush=True)
     
     def init_sound_players(self):
         """Initialize Qt media players for desktop environment"""
-        self.count_sound = QMediaPlayer(self)
+        # In-memory copies of the assets; the buffers must outlive the players using them
+        self._media_data = {}
+        self._media_buffers = []
+        
+        self.count_sounds = [QMediaPlayer(self) for _ in range(self.COUNT_PLAYER_RING)]
         if self.count_file_exists:
-            self.count_sound.setMedia(QMediaContent(QUrl.fromLocalFile(self.count_sound_path)))
-            self.count_sound.setVolume(80)  
+            for player in self.count_sounds:
+                self._set_media_from_memory(player, self.count_sound_path)
+                player.setVolume(80)
+                self._warm_up_player(player)
         
         self.succeed_player = QMediaPlayer(self)
         if self.succeed_file_exists:
-            self.succeed_player.setMedia(QMediaContent(QUrl.fromLocalFile(self.succeed_sound_path)))
+            self._set_media_from_memory(self.succeed_player, self.succeed_sound_path)
             self.succeed_player.setVolume(80)
+            self._warm_up_player(self.succeed_player)
             
         self.milestone_player = QMediaPlayer(self)
         if self.milestone_file_exists:
-            self.milestone_player.setMedia(QMediaContent(QUrl.fromLocalFile(self.milestone_sound_path)))
+            self._set_media_from_memory(self.milestone_player, self.milestone_sound_path)
             self.milestone_player.setVolume(85)
+            self._warm_up_player(self.milestone_player)
+    
+    def _set_media_from_memory(self, player, path):
+        """Feed the player from a QBuffer over the file's bytes so replays don't reopen the file"""
+        url = QUrl.fromLocalFile(path)
+        data = self._media_data.get(path)
+        if data is None:
+            try:
+                with open(path, 'rb') as f:
+                    data = QByteArray(f.read())
+            except OSError as e:
+                print(f"[SoundManager] ⚠ 读取音效失败，改用文件路径: {e}", flush=True)
+                player.setMedia(QMediaContent(url))
+                return
+            self._media_data[path] = data
+        
+        # One QBuffer per player (each keeps its own read position); QByteArray data is shared
+        buffer = QBuffer(self)
+        buffer.setData(data)
+        buffer.open(QIODevice.ReadOnly)
+        self._media_buffers.append(buffer)
+        # The URL is still passed so the backend can resolve the mime type
+        player.setMedia(QMediaContent(url), buffer)
+    
+    def _warm_up_player(self, player):
+        """Play the sound muted once it has loaded and stop it as soon as playback starts,
+        so the decoder pipeline is built before the first rep (setMedia loads asynchronously)"""
+        state = {'started': False, 'done': False}
+        
+        def finish(*_):
+            if state['done']:
+                return
+            state['done'] = True
+            player.mediaStatusChanged.disconnect(on_status)
+            if state['started']:
+                player.positionChanged.disconnect(finish)
+                player.stop()
+                player.setPosition(0)
+                player.setMuted(False)
+        
+        def on_status(status):
+            if not state['started'] and status == QMediaPlayer.LoadedMedia:
+                state['started'] = True
+                player.setMuted(True)
+                # First position update (or buffered/end status) means the decoder has run
+                player.positionChanged.connect(finish)
+                player.play()
+            elif status == QMediaPlayer.InvalidMedia or (
+                    state['started'] and status in (QMediaPlayer.BufferedMedia, QMediaPlayer.EndOfMedia)):
+                finish()
+        
+        player.mediaStatusChanged.connect(on_status)
+        if player.mediaStatus() == QMediaPlayer.LoadedMedia:
+            on_status(QMediaPlayer.LoadedMedia)  # Backend loaded synchronously
     
     def _send_ws_audio_event(self, sound_type, count=None):
         """Send audio event via WebSocket to browser clients"""
-        def send_async():
+        if self._closed:
+            return  # Late play after close(): don't restart the event writer
+        # The WebSocket server handles broadcasting to connected clients
+        msg_data = {
+            "type": "play_audio",
+            "sound": sound_type
+        }
+        if count is not None:
+            msg_data["count"] = count
+        
+        if self._event_writer is None:
+            self._event_writer = threading.Thread(target=self._event_writer_loop, daemon=True)
+            self._event_writer.start()
+        
+        try:
+            self._event_queue.put_nowait(msg_data)
+        except queue.Full:
+            print(f"[SoundManager-WS] ⚠ 事件队列已满，丢弃: {sound_type}", flush=True)
+    
+    def _event_writer_loop(self):
+        """Single long-lived writer: drains queued events onto the persistent connection"""
+        window = self.BATCH_WINDOW_MS / 1000.0
+        stopping = False
+        while not stopping:
+            first = self._event_queue.get()
+            if first is None:  # close() sentinel
+                break
+            events = [first]
+            
+            # Coalesce anything else that arrives within the batch window
+            deadline = time.monotonic() + window
+            while len(events) < EVENT_MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = self._event_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                events.append(event)
+            
             try:
-                # Simple HTTP request to trigger audio (using a simpler approach)
-                # The WebSocket server handles broadcasting to connected clients
-                import http.client
-                conn = http.client.HTTPConnection(self.WS_HOST, self.WS_PORT, timeout=2)
-                
-                # Use a special endpoint to trigger audio
-                msg_data = {
-                    "type": "play_audio",
-                    "sound": sound_type
-                }
-                if count is not None:
-                    msg_data["count"] = count
-                    
-                message = json.dumps(msg_data)
-                
-                # Try to connect to WebSocket server via simple TCP
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(1)
-                sock.connect((self.WS_HOST, self.WS_PORT + 100))  # Port 8865 for internal events
-                sock.send(message.encode())
-                sock.close()
-                print(f"[SoundManager-WS] ✓ 发送音频事件: {sound_type} (count={count})", flush=True)
-                
-            except ConnectionRefusedError:
+                self._send_event(self._encode_events(events))
+                if self.DEBUG:
+                    for e in events:
+                        print(f"[SoundManager-WS] ✓ 发送音频事件: {e['sound']} (count={e.get('count')})")
+            except (ConnectionRefusedError, FileNotFoundError):
                 print(f"[SoundManager-WS] ⚠ WebSocket服务器未就绪", flush=True)
             except Exception as e:
                 print(f"[SoundManager-WS] ⚠ 发送失败: {e}", flush=True)
         
-        thread = threading.Thread(target=send_async, daemon=True)
-        thread.start()
+        if self._event_sock is not None:
+            self._event_sock.close()
+            self._event_sock = None
+    
+    def _encode_events(self, events):
+        """Pack events into one binary frame; JSON line only for sounds without an id"""
+        if all(e['sound'] in SOUND_IDS for e in events):
+            return EVENT_HEADER.pack(EVENT_MAGIC, len(events)) + b"".join(
+                EVENT_RECORD.pack(SOUND_IDS[e['sound']],
+                                  EVENT_NO_COUNT if e.get('count') is None else e['count'])
+                for e in events
+            )
+        
+        if len(events) == 1:
+            payload = events[0]
+        else:
+            payload = {
+                "type": "play_audio_batch",
+                "events": [{k: v for k, v in e.items() if k != "type"} for e in events]
+            }
+        return json_dumps(payload) + b"\n"
+    
+    def _connect_event_socket(self):
+        """Open the stream connection to the audio server's event listener"""
+        # Unix socket skips the TCP/IP stack, but only reaches a same-host server
+        if hasattr(socket, 'AF_UNIX') and self.WS_HOST in ('localhost', '127.0.0.1'):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            address = self.EVENT_SOCKET_PATH
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            address = (self.WS_HOST, self.EVENT_PORT)
+        sock.settimeout(2)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    
+    def _ensure_event_socket(self):
+        """Connect lazily, backing off exponentially while the server is unreachable"""
+        if self._event_sock is not None:
+            return
+        now = time.monotonic()
+        if now < self._next_connect_time:
+            raise ConnectionRefusedError("reconnect backoff")
+        try:
+            self._event_sock = self._connect_event_socket()
+            self._reconnect_delay = 0.0
+        except OSError:
+            self._reconnect_delay = min(max(self._reconnect_delay * 2, self.RECONNECT_MIN_DELAY),
+                                        self.RECONNECT_MAX_DELAY)
+            self._next_connect_time = now + self._reconnect_delay
+            raise
+    
+    def _send_event(self, data):
+        """Write one event on the cached connection, reconnecting once if it went stale"""
+        for attempt in range(2):
+            self._ensure_event_socket()
+            try:
+                self._event_sock.sendall(data)
+                return
+            except OSError:
+                self._event_sock.close()
+                self._event_sock = None
+                if attempt:
+                    raise
+    
+    def _preload_pcm(self):
+        """Decode the sound assets to raw PCM once so playback needs no process spawn"""
+        self._audio_sink = next((tool for tool in self.RAW_SINK_COMMANDS if shutil.which(tool)), None)
+        if not self._audio_sink or not shutil.which('ffmpeg'):
+            return
+        
+        for path, exists in ((self.count_sound_path, self.count_file_exists),
+                             (self.succeed_sound_path, self.succeed_file_exists),
+                             (self.milestone_sound_path, self.milestone_file_exists)):
+            if not exists:
+                continue
+            try:
+                result = subprocess.run(
+                    ['ffmpeg', '-v', 'quiet', '-i', path, '-f', 's16le',
+                     '-ac', str(self.PCM_CHANNELS), '-ar', str(self.PCM_RATE), '-'],
+                    capture_output=True, timeout=10
+                )
+                if result.returncode == 0 and result.stdout:
+                    self._pcm_cache[path] = result.stdout
+            except (OSError, subprocess.TimeoutExpired) as e:
+                print(f"[SoundManager] ⚠ 预解码失败 {os.path.basename(path)}: {e}", flush=True)
+        
+        if self._pcm_cache:
+            print(f"[SoundManager] ✓ PCM预解码完成 ({len(self._pcm_cache)}个)，播放器: {self._audio_sink}", flush=True)
+    
+    def _get_sink(self, slot):
+        """Return the player process of a slot, (re)starting it if needed; None after close()"""
+        with self._audio_lock:
+            if self._closed:
+                return None
+            proc = self._audio_procs[slot]
+            if proc is None or proc.poll() is not None:
+                proc = self._audio_procs[slot] = subprocess.Popen(
+                    self.RAW_SINK_COMMANDS[self._audio_sink],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+            return proc
+    
+    def _write_pcm(self, pcm, droppable=False):
+        """Stream PCM into an idle persistent player; overlapping sounds go to another player
+        
+        When every player is still busy with earlier sounds, a droppable (count) sound is
+        already stale and is skipped instead of queuing behind them.
+        """
+        for slot, busy in enumerate(self._sink_busy):
+            if busy.acquire(blocking=False):
+                break
+        else:
+            if droppable:
+                return
+            slot, busy = 0, self._sink_busy[0]
+            busy.acquire()
+        
+        try:
+            for attempt in range(2):
+                proc = self._get_sink(slot)
+                if proc is None:
+                    return
+                try:
+                    proc.stdin.write(pcm)
+                    proc.stdin.flush()
+                    return
+                except (OSError, ValueError):
+                    # Player exited (or close() killed it): drop it so the retry restarts it
+                    with self._audio_lock:
+                        if self._audio_procs[slot] is proc:
+                            self._audio_procs[slot] = None
+                    if attempt:
+                        raise
+        finally:
+            busy.release()
     
     def _play_with_command(self, filepath):
         """Play audio using system command in background thread"""
+        if self._closed:
+            return  # Late play after close() (e.g. a queued counter signal): executor is shut down
+        
         def play_async():
             try:
+                pcm = self._pcm_cache.get(filepath)
+                if pcm is not None:
+                    # A late count sound may be skipped; milestone/completion always play
+                    self._write_pcm(pcm, droppable=filepath == self.count_sound_path)
+                    return
+                
+                # Fallback: one player process per sound
                 if self.audio_tool == 'ffplay':
                     cmd = ['ffplay', '-nodisp', '-autoexit', '-loglevel', 'warning', filepath]
                 elif self.audio_tool == 'mpv':
@@ -159,63 +482,97 @@ class SoundManager(QObject):
                 else:
                     cmd = ['ffplay', '-nodisp', '-autoexit', '-loglevel', 'warning', filepath]
                 
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-                
-                if result.returncode != 0 and result.stderr:
-                    print(f"[SoundManager] ⚠ 本地播放警告: {result.stderr[:200]}", flush=True)
+                # Fire and forget: don't block a worker for the length of the sound
+                proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                        start_new_session=True)
+                with self._audio_lock:
+                    # Reap players that have finished (poll() never blocks)
+                    self._active_procs = [p for p in self._active_procs if p.poll() is None]
+                    self._active_procs.append(proc)
                     
-            except subprocess.TimeoutExpired:
-                print(f"[SoundManager] ⚠ 播放超时", flush=True)
             except Exception as e:
                 print(f"[SoundManager] ✗ 播放异常: {e}", flush=True)
         
-        thread = threading.Thread(target=play_async, daemon=True)
-        thread.start()
+        self._play_executor.submit(play_async)
     
-    def play_count_sound(self, count=None):
-        """Play count sound effect"""
-        print(f"[SoundManager] 播放计数音效 (count={count})", flush=True)
-        
+    def close(self):
+        """Stop background workers and release the event connection and player process"""
+        # Mark closed first so play_* calls from here on return before touching the executor
+        with self._audio_lock:
+            self._closed = True
+        if self._event_writer is not None:
+            self._event_queue.put(None)
+            self._event_writer = None
+        self._play_executor.shutdown(wait=False)
+        # Take the processes under the lock, stop them outside it
+        with self._audio_lock:
+            sinks, self._audio_procs = self._audio_procs, [None] * self.PCM_SINKS
+            active, self._active_procs = self._active_procs, []
+        for proc in sinks:
+            if proc is not None:
+                # Terminate first: unblocks a worker still writing into the pipe
+                proc.terminate()
+                try:
+                    proc.stdin.close()
+                except (OSError, ValueError):
+                    pass
+        for proc in active:
+            if proc.poll() is None:
+                proc.terminate()
+    
+    def _build_player(self, sound_type, path, file_exists, qt_player_attr):
+        """Return a play function specialized for the resolved environment"""
         if self.use_docker:
-            # In Docker: send WebSocket event for browser playback
-            if self.use_websocket:
-                self._send_ws_audio_event('count', count)
+            # In Docker: WebSocket event for browser playback, local playback as backup
+            send_ws = self._send_ws_audio_event if self.use_websocket else None
+            play_local = self._play_with_command if (self.audio_tool and file_exists) else None
             
-            # Also try local playback as backup
-            if self.audio_tool and self.count_file_exists:
-                self._play_with_command(self.count_sound_path)
-        else:
-            # Desktop: use Qt player
-            if self.count_file_exists:
-                self.count_sound.stop()
-                self.count_sound.setPosition(0)
-                self.count_sound.play()
+            def play(count=None):
+                if send_ws is not None:
+                    send_ws(sound_type, count)
+                if play_local is not None:
+                    play_local(path)
+            return play
+        
+        if not file_exists:
+            return lambda count=None: None
+        
+        # Desktop: use Qt player
+        player = getattr(self, qt_player_attr)
+        
+        if isinstance(player, list):
+            # Ring of players: each event takes the next one, no stop() of a still-playing sound.
+            # Bound methods are resolved once here instead of on every rep.
+            next_in_ring = itertools.cycle([(p.setPosition, p.play) for p in player]).__next__
+            
+            def play(count=None):
+                reset, start = next_in_ring()
+                reset(0)
+                start()
+            return play
+        
+        reset, start = player.setPosition, player.play
+        
+        def play(count=None):
+            reset(0)
+            start()
+        return play
+    
+    def play_count_sound(self, count=None):
+        """Play count sound effect"""
+        if self.DEBUG:
+            print(f"[SoundManager] 播放计数音效 (count={count})")
+        self._play_count(count)
     
     def play_milestone_sound(self, count):
-        """Play milestone notification sound (every 10 counts)"""
-        if count > 0 and count % 10 == 0:
-            print(f"[SoundManager] 播放里程碑音效 (第{count}次)", flush=True)
-            
-            if self.use_docker:
-                if self.use_websocket:
-                    self._send_ws_audio_event('milestone', count)
-                if self.audio_tool and self.milestone_file_exists:
-                    self._play_with_command(self.milestone_sound_path)
-            else:
-                if self.milestone_file_exists:
-                    self.milestone_player.setPosition(0)
-                    self.milestone_player.play()
+        """Play milestone notification sound (every MILESTONE_INTERVAL counts)"""
+        # Called for every rep; return before any other work unless it's a milestone
+        if count % self.MILESTONE_INTERVAL or count <= 0:
+            return
+        print(f"[SoundManager] 播放里程碑音效 (第{count}次)", flush=True)
+        self._play_milestone(count)
     
     def play_completion_sound(self):
         """Play completion notification sound"""
         print(f"[SoundManager] 播放完成音效", flush=True)
-        
-        if self.use_docker:
-            if self.use_websocket:
-                self._send_ws_audio_event('succeed')
-            if self.audio_tool and self.succeed_file_exists:
-                self._play_with_command(self.succeed_sound_path)
-        else:
-            if self.succeed_file_exists:
-                self.succeed_player.setPosition(0)
-                self.succeed_player.play()
+        self._play_succeed()
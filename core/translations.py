@@ -367,6 +367,13 @@ class Translations:
             return cls.translations[key][cls.current_language]
         return key
     
+    @classmethod
+    def bulk(cls, keys):
+        """Get translations for several keys at once, as a {key: text} dict"""
+        lang = cls.current_language
+        translations = cls.translations
+        return {key: translations[key][lang] if key in translations else key for key in keys}
+    
     @classmethod
     def get_language(cls):
         """Get current language setting"""
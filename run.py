@@ -1,30 +1,66 @@
 import sys
 import os
 
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+# `python run.py` already puts this directory first; only add it when missing
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+def _report_import_error(e):
+    print(f"Import error: {e}")
+    print("Please ensure all dependencies are installed correctly")
+    print("Run: pip install -r requirements.txt")
 
 def main():
     try:
-        from PyQt5.QtWidgets import QApplication
-        from app.main_window import WorkoutTrackerApp
+        from PyQt5.QtCore import Qt, QTimer
+        from PyQt5.QtGui import QPixmap
+        from PyQt5.QtWidgets import QApplication, QSplashScreen
         
         app = QApplication(sys.argv)
         app.setApplicationName("AI Fitness Assistant")
         app.setApplicationVersion("1.2.0")
         
-        window = WorkoutTrackerApp()
-        window.show()
+        # Show a splash before the heavy cv2/mediapipe imports run
+        logo = os.path.join(_ROOT, "assets", "Logo.png")
+        pixmap = QPixmap(logo)
+        if not pixmap.isNull():
+            pixmap = pixmap.scaledToWidth(360, Qt.SmoothTransformation)
+        splash = QSplashScreen(pixmap)
+        splash.showMessage("Loading...", Qt.AlignBottom | Qt.AlignHCenter)
+        splash.show()
+        app.processEvents()
+        
+        state = {}
+        
+        def _deferred_start():
+            try:
+                from core.exercise_data import preload_exercises
+                preload_exercises()
+                
+                from app.main_window import WorkoutTrackerApp
+                
+                window = WorkoutTrackerApp()
+                state['window'] = window
+                window.show()
+                splash.finish(window)
+            except ImportError as e:
+                _report_import_error(e)
+                app.exit(1)
+            except Exception as e:
+                print(f"Startup failed: {e}")
+                app.exit(1)
+        
+        QTimer.singleShot(0, _deferred_start)
         
         sys.exit(app.exec_())
         
     except ImportError as e:
-        print(f"Import error: {e}")
-        print("Please ensure all dependencies are installed correctly")
-        print("Run: pip install -r requirements.txt")
+        _report_import_error(e)
         sys.exit(1)
     except Exception as e:
         print(f"Startup failed: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
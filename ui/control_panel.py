@@ -2,12 +2,87 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushBut
                              QComboBox, QGroupBox, QFrame, QLineEdit, QScrollArea)
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 from PyQt5.QtGui import QFont
-import json
+import copy
+import logging
 import os
-import sys
 from .styles import AppStyles
 from .custom_widgets import SwitchControl
 from core.translations import Translations as T
+from core.json_utils import json_dumps, json_loads
+from core.exercise_data import get_exercises_file_path, load_exercises
+
+logger = logging.getLogger(__name__)
+
+# Stylesheets shared by the panel's widgets, built once instead of per setStyleSheet call
+_TITLE_QSS = "font-size: 25pt; font-weight: bold; color: #2c3e50; margin-bottom: 5px;"
+_LABEL_BOLD_QSS = "color: #2c3e50; font-size: 10pt; font-weight: bold;"
+_LABEL_LARGE_QSS = "color: #2c3e50; font-size: 20pt; font-weight: bold;"
+_STAGE_QSS = "color: #3498db; font-size: 24pt; font-weight: bold;"
+_SEP_QSS = "background-color: #bdc3c7;"
+_URL_QSS = """
+    QLineEdit {
+        padding: 4px;
+        border: 2px solid #bdc3c7;
+        border-radius: 4px;
+        font-size: 10pt;
+    }
+    QLineEdit:focus {
+        border: 2px solid #3498db;
+    }
+"""
+_CONNECT_BTN_QSS = """
+    QPushButton {
+        background-color: #27ae60;
+        color: white;
+        padding: 4px 12px;
+        border-radius: 4px;
+        font-size: 10pt;
+        font-weight: bold;
+    }
+    QPushButton:hover {
+        background-color: #229954;
+    }
+"""
+_STATUS_IDLE_QSS = "color: #7f8c8d; font-size: 9pt;"
+_STATUS_BUSY_QSS = "color: #f39c12; font-size: 11pt;"
+_STATUS_OK_QSS = "color: #27ae60; font-size: 11pt;"
+_STATUS_ERROR_QSS = "color: #e74c3c; font-size: 11pt;"
+
+# AppStyles results used on the per-frame/per-click paths, resolved once at import
+_CONFIRM_BTN_QSS = AppStyles.get_confirm_button_style()
+_SUCCESS_BTN_QSS = AppStyles.get_success_button_style()
+# update_phase: stage -> (translation key, up indicator phase, down indicator phase).
+# Indicator looks come from AppStyles.get_phase_indicator_rules on phase_group, so a
+# phase change is a property flip + repolish rather than a stylesheet reparse.
+_PHASE_STYLES = {
+    "up": ("up", "on", "idle"),
+    "down": ("down", "idle", "on"),
+    None: ("prepare", "idle", "idle"),
+}
+# Forces the next update_phase call to redraw
+_PHASE_UNKNOWN = object()
+
+# Translation keys refreshed by ControlPanel.update_language
+_UPDATE_LANGUAGE_KEYS = (
+    "lightweight", "balanced", "performance",
+    "app_title", "control_options", "exercise_data", "motion_detection",
+    "count_completed", "exercise_type", "skeleton_display", "mirror_mode",
+    "increase", "decrease", "reset", "confirm",
+)
+
+# Angle outside (low, high) is highlighted in update_angle
+_ANGLE_HIGHLIGHT_BOUNDS = {
+    "squat": (120, float("inf")),        # Squat lower limit point
+    "pushup": (100, float("inf")),       # Pushup lower limit point
+    "leg_raise": (float("-inf"), 90),    # Leg raise upper limit point
+    "knee_raise": (float("-inf"), 100),  # Knee raise upper limit point
+    "knee_press": (100, 160),            # Knee press key points
+}
+
+# Exercise maps keyed by (path, mtime, language): (display_map, code_map);
+# they derive from the parse shared through core.exercise_data
+_EXERCISES_CACHE = {}
+
 
 class ControlPanel(QWidget):
     """Control panel component"""
@@ -25,12 +100,19 @@ class ControlPanel(QWidget):
     model_changed = pyqtSignal(str)  # lite/full/heavy
     tts_mode_changed = pyqtSignal(str)  # sound/ha
     
+    TTS_CONFIG_PATH = 'data/tts_config.json'
+    CONNECT_DEBOUNCE_MS = 300
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.exercise_colors = AppStyles.EXERCISE_COLORS
         
-        # Initialize exercise type mappings from JSON file
-        self.exercise_display_map = self.load_exercise_display_map()
+        # tts_config.json contents, reloaded only when the file's mtime changes
+        self._tts_cfg = None
+        self._tts_cfg_mtime = 0
+        
+        # Initialize exercise type mappings (and their reverse) from JSON file
+        self.exercise_display_map, self.exercise_code_map = self._load_exercise_maps()
         
         # Initialize model type mappings - only keep RTMPose options
         self.model_display_map = {
@@ -39,89 +121,101 @@ class ControlPanel(QWidget):
             "performance": T.get("performance")
         }
         
-        # Initialize reverse mappings
-        self.exercise_code_map = {v: k for k, v in self.exercise_display_map.items()}
         self.current_exercise = "overhead_press"
+        # Authoritative count; counter_value only mirrors it
+        self._count = 0
+        # Counter/phase stylesheets for the current exercise's color
+        self._refresh_exercise_styles()
+        # Stage last drawn by update_phase; the initial widgets already show the None/prepare state
+        self._shown_phase = None
+        # Stage last drawn by update_stage (None once update_phase or a language switch redraws)
+        self._shown_stage = None
+        # Stylesheet currently applied to counter_value
+        self._shown_counter_qss = None
         
         # Setup layout
         self.layout = QVBoxLayout(self)
         self.setup_ui()
-    
-    def get_exercises_file_path(self):
-        """Get exercises.json file path, compatible with development and packaged environments"""
-        if getattr(sys, 'frozen', False):
-            # Packaged environment
-            # First check for external data folder next to exe (user editable)
-            exe_dir = os.path.dirname(sys.executable)
-            external_file = os.path.join(exe_dir, 'data', 'exercises.json')
-            if os.path.exists(external_file):
-                return external_file
-            # Fall back to bundled data inside exe
-            base_path = sys._MEIPASS
-            exercises_file = os.path.join(base_path, 'data', 'exercises.json')
-        else:
-            # Development or Docker environment
-            # First try absolute path for Docker container
-            docker_path = '/app/data/exercises.json'
-            if os.path.exists(docker_path):
-                print(f"[控制面板] 使用Docker路径: {docker_path}")
-                return docker_path
-            # Fall back to relative path for local development
-            exercises_file = os.path.join('data', 'exercises.json')
         
-        return exercises_file
+        # One reusable timer reverts the confirm button's success style
+        self._confirm_revert_timer = QTimer(self)
+        self._confirm_revert_timer.setSingleShot(True)
+        self._confirm_revert_timer.timeout.connect(self._revert_confirm_style)
+        
+        # Debounces the connect button so a double-click opens the stream once
+        self._pending_source = None
+        self._connect_timer = QTimer(self)
+        self._connect_timer.setSingleShot(True)
+        self._connect_timer.timeout.connect(self._do_connect_source)
+    
+    def _load_exercise_maps(self):
+        """Return (display_map, code_map) copies, parsing exercises.json only when it or the language changed"""
+        exercises_file = get_exercises_file_path()
+        try:
+            key = (exercises_file, os.stat(exercises_file).st_mtime, T.get_language())
+        except OSError:
+            key = None
+        
+        cached = _EXERCISES_CACHE.get(key) if key is not None else None
+        if cached is None:
+            cached = self.load_exercise_display_map()
+            if key is not None:
+                _EXERCISES_CACHE[key] = cached
+        # Copies, so callers mutating their maps can't corrupt the cache
+        return dict(cached[0]), dict(cached[1])
     
     def load_exercise_display_map(self):
-        """Load exercise display map from JSON file"""
-        exercises_file = self.get_exercises_file_path()
+        """Load (exercise_display_map, exercise_code_map) from JSON file"""
+        exercises_file = get_exercises_file_path()
         
-        # Debug log
-        print(f"[控制面板] 尝试加载运动类型文件: {exercises_file}")
-        print(f"[控制面板] 文件存在: {os.path.exists(exercises_file)}")
+        logger.debug("[控制面板] 尝试加载运动类型文件: %s", exercises_file)
         
         try:
             if os.path.exists(exercises_file):
-                with open(exercises_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    exercises = data.get('exercises', {})
-                    
-                    # Build exercise_display_map from JSON file
-                    exercise_map = {}
-                    current_lang = T.get_language()  # Get current language setting
+                # Language-independent parse, shared with the stats panel and preload_exercises()
+                exercises = load_exercises(exercises_file)
+                
+                # Build exercise_display_map and its reverse from JSON file in one pass
+                exercise_map = {}
+                code_map = {}
+                current_lang = T.get_language()  # Get current language setting
+                
+                for exercise_type, config in exercises.items():
+                    # Get display name from JSON file based on current language
+                    if current_lang == 'zh':
+                        display_name = config.get('name_zh', '')
+                    elif current_lang == 'en':
+                        display_name = config.get('name_en', '')
+                    else:
+                        # Fallback to English if language not supported
+                        display_name = config.get('name_en', '')
                     
-                    for exercise_type, config in exercises.items():
-                        # Get display name from JSON file based on current language
-                        if current_lang == 'zh':
-                            display_name = config.get('name_zh', '')
-                        elif current_lang == 'en':
-                            display_name = config.get('name_en', '')
-                        else:
-                            # Fallback to English if language not supported
-                            display_name = config.get('name_en', '')
-                        
-                        # If name not found in JSON, try translation module as fallback
-                        if not display_name:
-                            display_name = T.get(exercise_type)
-                        
-                        if display_name:
-                            exercise_map[exercise_type] = display_name
+                    # If name not found in JSON, try translation module as fallback
+                    if not display_name:
+                        display_name = T.get(exercise_type)
                     
-                    if exercise_map:
-                        print(f"[控制面板] 成功加载 {len(exercise_map)} 种运动: {list(exercise_map.keys())}")
-                        return exercise_map
-                    else:
-                        print(f"WARNING: No exercises found in {exercises_file}, using defaults")
-                        return self._get_default_exercises()
+                    if display_name:
+                        exercise_map[exercise_type] = display_name
+                        code_map[display_name] = exercise_type
+                
+                if exercise_map:
+                    logger.debug("[控制面板] 成功加载 %d 种运动: %s", len(exercise_map), exercise_map.keys())
+                    return exercise_map, code_map
+                else:
+                    logger.warning("No exercises found in %s, using defaults", exercises_file)
+                    return self._get_default_maps()
             else:
-                print(f"ERROR: Exercises file not found at {exercises_file}")
-                print("Using default exercises instead")
-                return self._get_default_exercises()
+                logger.error("Exercises file not found at %s, using default exercises instead", exercises_file)
+                return self._get_default_maps()
         except Exception as e:
-            print(f"ERROR loading exercises from JSON: {e}")
-            import traceback
-            traceback.print_exc()
-            print("Using default exercises instead")
-            return self._get_default_exercises()
+            logger.error("Error loading exercises from JSON: %s, using default exercises instead", e,
+                         exc_info=logger.isEnabledFor(logging.DEBUG))
+            return self._get_default_maps()
+    
+    def _get_default_maps(self):
+        """Return (display_map, code_map) built from the default exercise types"""
+        defaults = self._get_default_exercises()
+        return defaults, {v: k for k, v in defaults.items()}
     
     def _get_default_exercises(self):
         """Return default exercise types when JSON loading fails - matches exercises.json"""
@@ -154,7 +248,7 @@ class ControlPanel(QWidget):
         self.title_label = QLabel(T.get("app_title"))
         self.title_label.setFont(QFont("Arial", 20, QFont.Bold))
         self.title_label.setAlignment(Qt.AlignCenter)
-        self.title_label.setStyleSheet("font-size: 25pt; font-weight: bold; color: #2c3e50; margin-bottom: 5px;")
+        self.title_label.setStyleSheet(_TITLE_QSS)
         self.content_layout.addWidget(self.title_label)
         
         # Add info group
@@ -184,11 +278,11 @@ class ControlPanel(QWidget):
         # Create counter display
         counter_layout = QHBoxLayout()
         self.counter_label = QLabel(T.get("count_completed"))
-        self.counter_label.setStyleSheet("color: #2c3e50; font-size: 20pt; font-weight: bold;")
+        self.counter_label.setStyleSheet(_LABEL_LARGE_QSS)
         self.counter_label.setMinimumHeight(40)
         
         self.counter_value = QLabel("0")
-        self.counter_value.setStyleSheet(AppStyles.get_counter_value_style())
+        self._set_counter_qss(AppStyles.get_counter_value_style())
         self.counter_value.setAlignment(Qt.AlignCenter)
         self.counter_value.setFixedSize(180, 120)
         
@@ -228,134 +322,99 @@ class ControlPanel(QWidget):
         
         # Exercise type selection
         self.exercise_label = QLabel(T.get("exercise_type"))
-        self.exercise_label.setStyleSheet("color: #2c3e50; font-size: 10pt; font-weight: bold;")
+        self.exercise_label.setStyleSheet(_LABEL_BOLD_QSS)
         controls_layout.addWidget(self.exercise_label)
         
         self.exercise_combo = QComboBox()
         # Set dropdown menu style
         self.exercise_combo.setStyleSheet(AppStyles.get_exercise_combo_style())
         
-        # Use our predefined exercise type mappings
-        for code, display in self.exercise_display_map.items():
-            self.exercise_combo.addItem(display)
+        # Use our predefined exercise type mappings (one insert instead of one per item)
+        self.exercise_combo.addItems(list(self.exercise_display_map.values()))
+        # Exercise code -> combo index, so selection never scans the items
+        self._exercise_index = {code: i for i, code in enumerate(self.exercise_display_map)}
         
         # Set default selected item
-        overhead_press_text = self.exercise_display_map.get("overhead_press", "")
-        if overhead_press_text:
-            self.exercise_combo.setCurrentText(overhead_press_text)
+        default_index = self._exercise_index.get("overhead_press")
+        if default_index is not None:
+            self.exercise_combo.setCurrentIndex(default_index)
             
         self.exercise_combo.currentTextChanged.connect(self._on_exercise_changed)
         controls_layout.addWidget(self.exercise_combo)
         
-        # Video Source selection
-        video_source_layout = QVBoxLayout()
-        
-        # Title
+        # Video Source selection (added straight to controls_layout; nested boxes
+        # only inherited its spacing and added no layout of their own)
         source_title = QLabel(T.get("video_source"))
-        source_title.setStyleSheet("color: #2c3e50; font-size: 10pt; font-weight: bold;")
-        video_source_layout.addWidget(source_title)
+        source_title.setStyleSheet(_LABEL_BOLD_QSS)
+        controls_layout.addWidget(source_title)
         
         # Source type selector
-        video_source_layout.addWidget(QLabel("类型:"))
+        controls_layout.addWidget(QLabel("类型:"))
         self.source_type_combo = QComboBox()
         self.source_type_combo.setStyleSheet(AppStyles.get_exercise_combo_style())
         self.source_type_combo.addItem("RTSP摄像头", "rtsp")
         self.source_type_combo.addItem("IP摄像头(HTTP)", "http")
-        video_source_layout.addWidget(self.source_type_combo)
+        controls_layout.addWidget(self.source_type_combo)
         
         # URL/ID input
-        video_source_layout.addWidget(QLabel("地址:"))
+        controls_layout.addWidget(QLabel("地址:"))
         self.source_url_input = QLineEdit()
         self.source_url_input.setPlaceholderText("输入RTSP或HTTP地址...")
-        self.source_url_input.setStyleSheet("""
-            QLineEdit {
-                padding: 4px;
-                border: 2px solid #bdc3c7;
-                border-radius: 4px;
-                font-size: 10pt;
-            }
-            QLineEdit:focus {
-                border: 2px solid #3498db;
-            }
-        """)
-        video_source_layout.addWidget(self.source_url_input)
+        self.source_url_input.setStyleSheet(_URL_QSS)
+        controls_layout.addWidget(self.source_url_input)
         
         # Connect button
         button_layout = QHBoxLayout()
         self.connect_source_btn = QPushButton("连接")
-        self.connect_source_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #27ae60;
-                color: white;
-                padding: 4px 12px;
-                border-radius: 4px;
-                font-size: 10pt;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #229954;
-            }
-        """)
+        self.connect_source_btn.setStyleSheet(_CONNECT_BTN_QSS)
         self.connect_source_btn.clicked.connect(self._on_connect_source)
         
         self.source_status_label = QLabel("● 未连接")
-        self.source_status_label.setStyleSheet("color: #7f8c8d; font-size: 9pt;")
+        self.source_status_label.setStyleSheet(_STATUS_IDLE_QSS)
+        self._source_status_qss = _STATUS_IDLE_QSS
         
         button_layout.addWidget(self.connect_source_btn)
         button_layout.addWidget(self.source_status_label)
         button_layout.addStretch()
-        video_source_layout.addLayout(button_layout)
+        controls_layout.addLayout(button_layout)
         
-        controls_layout.addLayout(video_source_layout)
         controls_layout.addWidget(self._create_separator())
         
         # Model Version Selection
-        model_layout = QVBoxLayout()
-        
         model_title = QLabel("模型版本:")
-        model_title.setStyleSheet("color: #2c3e50; font-size: 10pt; font-weight: bold;")
-        model_layout.addWidget(model_title)
+        model_title.setStyleSheet(_LABEL_BOLD_QSS)
+        controls_layout.addWidget(model_title)
         
-        model_select_layout = QVBoxLayout()
-        model_select_layout.addWidget(QLabel("精度:"))
+        controls_layout.addWidget(QLabel("精度:"))
         self.model_combo = QComboBox()
         self.model_combo.setStyleSheet(AppStyles.get_exercise_combo_style())
         self.model_combo.addItem("Lite - 快速（推荐）", "lite")
         self.model_combo.addItem("Full - 平衡", "full")
         self.model_combo.addItem("Heavy - 精确（慢）", "heavy")
         self.model_combo.currentIndexChanged.connect(self._on_model_changed)
-        model_select_layout.addWidget(self.model_combo)
-        model_layout.addLayout(model_select_layout)
+        controls_layout.addWidget(self.model_combo)
         
-        controls_layout.addLayout(model_layout)
         controls_layout.addWidget(self._create_separator())
         
         # TTS Voice Announcement
-        tts_layout = QVBoxLayout()
-        
         tts_title = QLabel("语音播报:")
-        tts_title.setStyleSheet("color: #2c3e50; font-size: 10pt; font-weight: bold;")
-        tts_layout.addWidget(tts_title)
+        tts_title.setStyleSheet(_LABEL_BOLD_QSS)
+        controls_layout.addWidget(tts_title)
         
-        mode_layout = QVBoxLayout()
-        mode_layout.addWidget(QLabel("模式:"))
+        controls_layout.addWidget(QLabel("模式:"))
         self.tts_mode_combo = QComboBox()
         self.tts_mode_combo.setStyleSheet(AppStyles.get_exercise_combo_style())
         self.tts_mode_combo.addItem("🔊 本地音效", "sound")
         self.tts_mode_combo.addItem("🏠 Home Assistant", "ha")
         self.tts_mode_combo.currentIndexChanged.connect(self._on_tts_mode_changed)
-        mode_layout.addWidget(self.tts_mode_combo)
-        tts_layout.addLayout(mode_layout)
+        controls_layout.addWidget(self.tts_mode_combo)
         
         # HA配置按钮
-        ha_btn_layout = QHBoxLayout()
         self.ha_config_btn = QPushButton("⚙ 配置Home Assistant")
         self.ha_config_btn.clicked.connect(self._open_ha_config)
         self.ha_config_btn.setEnabled(False)  # 默认禁用
-        ha_btn_layout.addWidget(self.ha_config_btn)
-        tts_layout.addLayout(ha_btn_layout)
+        controls_layout.addWidget(self.ha_config_btn)
         
-        controls_layout.addLayout(tts_layout)
         controls_layout.addWidget(self._create_separator())
 
         
@@ -400,7 +459,7 @@ class ControlPanel(QWidget):
         # Confirm record button - blue system
         self.confirm_button = QPushButton(T.get("confirm"))
         self.confirm_button.setFixedSize(80, 32)
-        self.confirm_button.setStyleSheet(AppStyles.get_confirm_button_style())
+        self.confirm_button.setStyleSheet(_CONFIRM_BTN_QSS)
         self.confirm_button.clicked.connect(self._on_confirm_record)
         counter_buttons_layout.addWidget(self.confirm_button)
 
@@ -408,87 +467,67 @@ class ControlPanel(QWidget):
         
         self.content_layout.addWidget(self.controls_group)
     
+    def _set_count(self, new_count):
+        """Update the authoritative count, touching the label only when the value changes"""
+        if new_count != self._count:
+            self._count = new_count
+            self.counter_value.setText(str(new_count))
+    
     def _on_increase_counter(self):
         """Manually increase counter value"""
-        try:
-            # Get current count value
-            current_count = int(self.counter_value.text())
-            
-            # Increase by 1 each time
-            new_count = current_count + 1
-            
-            # Update display
-            self.counter_value.setText(str(new_count))
-            
-            # Send signal
-            self.counter_increase.emit(new_count)
-            
-            # Show success animation
-            self.show_success_animation()
-            
-        except ValueError:
-            # If count value is not a valid number, reset to 1
-            self.counter_value.setText("1")
-            self.counter_increase.emit(1)
+        # Increase by 1 each time
+        new_count = self._count + 1
+        
+        # Update display
+        self._set_count(new_count)
+        
+        # Send signal
+        self.counter_increase.emit(new_count)
+        
+        # Show success animation
+        self.show_success_animation()
 
     def _on_decrease_counter(self):
         """Manually decrease counter value"""
-        try:
-            # Get current count value
-            current_count = int(self.counter_value.text())
-            
-            # Ensure count doesn't go negative
-            new_count = max(0, current_count - 1)
-            
-            # Update display
-            self.counter_value.setText(str(new_count))
-            
-            # Send signal
-            self.counter_decrease.emit(new_count)
-            
-            # Update style
-            self.update_counter_style()
-            
-        except ValueError:
-            # If count value is not a valid number, reset to 0
-            self.counter_value.setText("0")
-            self.counter_decrease.emit(0)
+        # Ensure count doesn't go negative
+        new_count = max(0, self._count - 1)
+        
+        # Update display
+        self._set_count(new_count)
+        
+        # Send signal
+        self.counter_decrease.emit(new_count)
+        
+        # Update style
+        self.update_counter_style()
 
     def _on_confirm_record(self):
         """Confirm record current exercise result"""
-        try:
-            # Get current count value
-            current_count = int(self.counter_value.text())
+        # Only record if count is greater than 0
+        if self._count > 0:
+            # Send confirm record signal with current exercise type
+            self.record_confirmed.emit(self.current_exercise)
             
-            # Only record if count is greater than 0
-            if current_count > 0:
-                # Send confirm record signal with current exercise type
-                self.record_confirmed.emit(self.current_exercise)
-                
-                # Show success style - change background to green
-                self.confirm_button.setStyleSheet(
-                    AppStyles.get_success_button_style()
-                )
-                
-                # Return to normal style after 1.5 seconds
-                QTimer.singleShot(1500, lambda: self.confirm_button.setStyleSheet(
-                    AppStyles.get_confirm_button_style()
-                ))
-                
-        except ValueError:
-            # If count value is not a valid number, ignore directly
-            pass
+            # Show success style - change background to green
+            self.confirm_button.setStyleSheet(_SUCCESS_BTN_QSS)
+            
+            # Return to normal style after 1.5 seconds (restarting on repeated clicks)
+            self._confirm_revert_timer.start(1500)
+    
+    def _revert_confirm_style(self):
+        """Restore the confirm button's normal style"""
+        self.confirm_button.setStyleSheet(_CONFIRM_BTN_QSS)
     
     def setup_phase_group(self):
         """Setup phase display group"""
         self.phase_group = QGroupBox(T.get("phase_display"))
-        self.phase_group.setStyleSheet(AppStyles.get_group_box_style())
+        self.phase_group.setStyleSheet(self._phase_group_qss)
         phase_layout = QVBoxLayout(self.phase_group)
         
         # Current phase label
         phase_label_layout = QHBoxLayout()
         self.phase_title = QLabel(T.get("current_phase"))
-        self.phase_title.setStyleSheet("color: #2c3e50; font-size: 20pt; font-weight: bold;")
+        self.phase_title.setStyleSheet(_LABEL_LARGE_QSS)
         
         phase_label_layout.addWidget(self.phase_title)
         phase_layout.addLayout(phase_label_layout)
@@ -498,11 +537,11 @@ class ControlPanel(QWidget):
         
         # Current phase indicator
         self.up_indicator = QLabel("↑")
-        self.up_indicator.setStyleSheet(AppStyles.get_phase_indicator_style(False))
+        self.up_indicator.setProperty("phase", "idle")
         self.up_indicator.setAlignment(Qt.AlignCenter)
         
         self.down_indicator = QLabel("↓")
-        self.down_indicator.setStyleSheet(AppStyles.get_phase_indicator_style(False))
+        self.down_indicator.setProperty("phase", "idle")
         self.down_indicator.setAlignment(Qt.AlignCenter)
         
         # Add to layout
@@ -514,7 +553,7 @@ class ControlPanel(QWidget):
         
         # Phase value display
         self.stage_value = QLabel(T.get("prepare"))
-        self.stage_value.setStyleSheet("color: #3498db; font-size: 24pt; font-weight: bold;")
+        self.stage_value.setStyleSheet(_STAGE_QSS)
         self.stage_value.setAlignment(Qt.AlignCenter)
         self.stage_value.setFixedSize(180, 60)
         
@@ -538,7 +577,11 @@ class ControlPanel(QWidget):
             return
             
         exercise_code = self.exercise_code_map[exercise_display]
+        # Programmatic re-selection of the same exercise: nothing to switch downstream
+        if exercise_code == self.current_exercise:
+            return
         self.current_exercise = exercise_code
+        self._refresh_exercise_styles()
         self.exercise_changed.emit(exercise_code)
         self.update_counter_style()
     
@@ -568,45 +611,54 @@ class ControlPanel(QWidget):
         separator = QFrame()
         separator.setFrameShape(QFrame.HLine)
         separator.setFrameShadow(QFrame.Sunken)
-        separator.setStyleSheet("background-color: #bdc3c7;")
+        separator.setStyleSheet(_SEP_QSS)
         return separator
     
     def _on_connect_source(self):
-        """视频源连接按钮处理"""
-        source_type = self.source_type_combo.currentData()
-        source_input = self.source_url_input.text().strip()
+        """视频源连接按钮处理（防抖：300ms内的重复点击只触发一次连接）"""
+        self._pending_source = (self.source_type_combo.currentData(), self.source_url_input.text().strip())
+        self._connect_timer.start(self.CONNECT_DEBOUNCE_MS)
+    
+    def _do_connect_source(self):
+        """校验输入并发出视频源切换信号"""
+        source_type, source_input = self._pending_source
         
         # 验证输入
         if not source_input:
             if source_type == "camera":
                 source_input = "0"  # 默认摄像头
             else:
-                self.source_status_label.setText("● 请输入URL")
-                self.source_status_label.setStyleSheet("color: #e74c3c; font-size: 11pt;")
+                self._set_source_status("● 请输入URL", _STATUS_ERROR_QSS)
                 return
         
-        # 更新状态
-        self.source_status_label.setText("● 连接中...")
-        self.source_status_label.setStyleSheet("color: #f39c12; font-size: 11pt;")
+        # 更新状态；连接完成前禁用按钮（update_source_status中恢复）
+        self._set_source_status("● 连接中...", _STATUS_BUSY_QSS)
+        self.connect_source_btn.setEnabled(False)
         
         # 发送信号
         self.video_source_changed.emit(source_type, source_input)
     
     def update_source_status(self, connected, message=""):
         """更新视频源连接状态"""
+        self.connect_source_btn.setEnabled(True)
         if connected:
-            status_text = f"● 已连接{(' - ' + message) if message else ''}"
-            self.source_status_label.setText(status_text)
-            self.source_status_label.setStyleSheet("color: #27ae60; font-size: 11pt;")
+            status_text = "● 已连接 - %s" % message if message else "● 已连接"
+            self._set_source_status(status_text, _STATUS_OK_QSS)
         else:
-            status_text = f"● 连接失败{(' - ' + message) if message else ''}"
-            self.source_status_label.setText(status_text)
-            self.source_status_label.setStyleSheet("color: #e74c3c; font-size: 11pt;")
+            status_text = "● 连接失败 - %s" % message if message else "● 连接失败"
+            self._set_source_status(status_text, _STATUS_ERROR_QSS)
+    
+    def _set_source_status(self, text, qss):
+        """更新状态标签；样式未变化时不重新设置（避免QSS重新解析）"""
+        self.source_status_label.setText(text)
+        if qss is not self._source_status_qss:
+            self._source_status_qss = qss
+            self.source_status_label.setStyleSheet(qss)
     
     def _on_model_changed(self, index):
         """模型版本切换处理"""
         model_version = self.model_combo.currentData()
-        print(f"[控制面板] 切换模型版本: {model_version}")
+        logger.info("[控制面板] 切换模型版本: %s", model_version)
         self.model_changed.emit(model_version)
     
     def _on_tts_mode_changed(self, index):
@@ -614,22 +666,51 @@ class ControlPanel(QWidget):
         mode = self.tts_mode_combo.currentData()
         # 根据模式启用/禁用配置按钮
         self.ha_config_btn.setEnabled(mode == "ha")
-        print(f"[控制面板] 切换TTS模式: {mode}")
+        logger.info("[控制面板] 切换TTS模式: %s", mode)
         self.tts_mode_changed.emit(mode)
     
+    def set_tts_mode(self, mode):
+        """Show the given TTS mode ("sound"/"ha") without emitting tts_mode_changed"""
+        index = self.tts_mode_combo.findData(mode)
+        if index < 0:
+            return
+        self.tts_mode_combo.blockSignals(True)
+        try:
+            self.tts_mode_combo.setCurrentIndex(index)
+        finally:
+            self.tts_mode_combo.blockSignals(False)
+        self.ha_config_btn.setEnabled(mode == "ha")
+    
+    def _load_tts_config(self):
+        """加载tts_config.json，文件未修改时直接返回内存缓存"""
+        try:
+            mtime = os.stat(self.TTS_CONFIG_PATH).st_mtime
+        except OSError:
+            return {}
+        if self._tts_cfg is None or mtime != self._tts_cfg_mtime:
+            try:
+                with open(self.TTS_CONFIG_PATH, 'rb') as f:
+                    self._tts_cfg = json_loads(f.read())
+                self._tts_cfg_mtime = mtime
+            except (OSError, ValueError):
+                return {}
+        return self._tts_cfg
+    
+    def _save_tts_config(self, config):
+        """原子写入tts_config.json（临时文件 + os.replace），并同步内存缓存"""
+        tmp_path = self.TTS_CONFIG_PATH + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(json_dumps(config, indent=True))
+        os.replace(tmp_path, self.TTS_CONFIG_PATH)
+        self._tts_cfg = config
+        self._tts_cfg_mtime = os.stat(self.TTS_CONFIG_PATH).st_mtime
+    
     def _open_ha_config(self):
         """打开HA配置对话框"""
         from ui.ha_config_dialog import HAConfigDialog
-        import json
         
-        # 加载当前配置
-        config_path = 'data/tts_config.json'
-        config = {}
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-        except:
-            pass
+        # 加载当前配置（副本，保存成功前不改动缓存）
+        config = copy.deepcopy(self._load_tts_config())
         
         # 打开对话框
         dialog = HAConfigDialog(self, config)
@@ -645,26 +726,23 @@ class ControlPanel(QWidget):
             config['ha_config'].update(ha_config)
             
             try:
-                with open(config_path, 'w', encoding='utf-8') as f:
-                    json.dump(config, f, ensure_ascii=False, indent=2)
-                print("[控制面板] HA配置已保存")
+                self._save_tts_config(config)
+                logger.info("[控制面板] HA配置已保存")
                 
                 # 重新加载配置到主窗口
                 if hasattr(self.parent(), 'init_tts_manager'):
                     self.parent().init_tts_manager()
-                    print("[控制面板] TTS配置已重新加载")
+                    logger.info("[控制面板] TTS配置已重新加载")
             except Exception as e:
-                print(f"[错误] 保存HA配置失败: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.error("[错误] 保存HA配置失败: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
     
     def update_counter(self, value):
         """Update counter value"""
-        old_count = int(self.counter_value.text() or "0")
+        old_count = self._count
         new_count = int(value)
         
         # Update counter display
-        self.counter_value.setText(str(value))
+        self._set_count(new_count)
         
         # If increased, show animation
         if new_count > old_count:
@@ -678,208 +756,191 @@ class ControlPanel(QWidget):
             
             # Update color based on angle value and exercise type
             try:
-                current_exercise = self.exercise_display_map.get(exercise_type, "bicep_curl")
-                current_color = self.exercise_colors.get(current_exercise, "#3498db")
+                if exercise_type == self.current_exercise:
+                    current_color = self._current_color
+                else:
+                    current_color = self._exercise_color(exercise_type)
                 
                 # Determine if highlighting is needed
                 highlight = False
                 angle_value = float(angle_text)
                 
-                if exercise_type == "squat" and angle_value < 120:  # Squat lower limit point
-                    highlight = True
-                elif exercise_type == "pushup" and angle_value < 100:  # Pushup lower limit point
-                    highlight = True
-                elif exercise_type == "leg_raise" and angle_value > 90:  # Leg raise upper limit point
-                    highlight = True
-                elif exercise_type == "knee_raise" and angle_value > 100:  # Knee raise upper limit point
-                    highlight = True
-                elif exercise_type == "knee_press" and (angle_value < 100 or angle_value > 160):  # Knee press key points
-                    highlight = True
+                bounds = _ANGLE_HIGHLIGHT_BOUNDS.get(exercise_type)
+                if bounds is not None:
+                    low, high = bounds
+                    highlight = angle_value < low or angle_value > high
                 
                 # Set style
                 self.angle_value.setStyleSheet(AppStyles.get_angle_value_style(current_color, highlight))
             except Exception as e:
-                print(f"Error updating angle style: {e}")
+                logger.error("Error updating angle style: %s", e)
     
     def update_phase(self, stage):
         """Update phase display"""
-        if stage == "up":
-            self.stage_value.setText(T.get("up"))
-            self.up_indicator.setStyleSheet(AppStyles.get_phase_indicator_style(True))
-            self.down_indicator.setStyleSheet(AppStyles.get_phase_indicator_style(False))
-        elif stage == "down":
-            self.stage_value.setText(T.get("down"))
-            self.up_indicator.setStyleSheet(AppStyles.get_phase_indicator_style(False))
-            self.down_indicator.setStyleSheet(AppStyles.get_phase_indicator_style(True))
-        else:
-            self.stage_value.setText(T.get("prepare"))
-            self.up_indicator.setStyleSheet(AppStyles.get_phase_indicator_style(False))
-            self.down_indicator.setStyleSheet(AppStyles.get_phase_indicator_style(False))
+        # Called for every processed frame; the stage rarely changes between frames
+        if stage == self._shown_phase:
+            return
+        self._shown_phase = stage
+        self._shown_stage = None
+        text_key, up_phase, down_phase = _PHASE_STYLES.get(stage, _PHASE_STYLES[None])
+        self.stage_value.setText(T.get(text_key))
+        self._set_indicator_phase(self.up_indicator, up_phase)
+        self._set_indicator_phase(self.down_indicator, down_phase)
+    
+    @staticmethod
+    def _set_indicator_phase(indicator, phase):
+        """Switch an indicator's look via its "phase" property; repolish only on change"""
+        if indicator.property("phase") != phase:
+            indicator.setProperty("phase", phase)
+            style = indicator.style()
+            style.unpolish(indicator)
+            style.polish(indicator)
     
     def update_stage(self, stage, exercise_type):
         """Update exercise stage"""
-        if not stage:
+        if not stage or stage == self._shown_stage:
             return
-            
+        self._shown_stage = stage
+        
         self.stage_value.setText(stage)
+        # Indicators are restyled here, so the next update_phase must redraw
+        self._shown_phase = _PHASE_UNKNOWN
         
-        try:
-            # Update stage indicator
-            current_exercise = self.exercise_display_map.get(exercise_type, "")
-            
-            # If preset color not found, use default color
-            if current_exercise in AppStyles.EXERCISE_COLORS:
-                current_color = AppStyles.EXERCISE_COLORS[current_exercise]
-            else:
-                current_color = "#3498db"  # Default use blue
-            
-            if stage == "up":
-                self.up_indicator.setStyleSheet(AppStyles.get_phase_indicator_style(True, current_color))
-                self.down_indicator.setStyleSheet(AppStyles.get_phase_indicator_style(False))
-            elif stage == "down":
-                self.down_indicator.setStyleSheet(AppStyles.get_phase_indicator_style(True, current_color))
-                self.up_indicator.setStyleSheet(AppStyles.get_phase_indicator_style(False))
-        except Exception as e:
-            print(f"Error in update_stage: {e}")
-            # Use default color on error
-            current_color = "#3498db"
+        # "accent" uses the current exercise's color (see _refresh_exercise_styles)
+        if stage == "up":
+            self._set_indicator_phase(self.up_indicator, "accent")
+            self._set_indicator_phase(self.down_indicator, "idle")
+        elif stage == "down":
+            self._set_indicator_phase(self.down_indicator, "accent")
+            self._set_indicator_phase(self.up_indicator, "idle")
     
     def show_success_animation(self):
         """Show success animation for counter increase"""
-        self.counter_value.setStyleSheet(AppStyles.get_success_counter_style())
+        self._set_counter_qss(AppStyles.get_success_counter_style())
+    
+    def _exercise_color(self, exercise_code):
+        """Color for an exercise code, default blue when it has no preset"""
+        current_exercise = self.exercise_display_map.get(exercise_code, "")
+        return AppStyles.EXERCISE_COLORS.get(current_exercise, "#3498db")
+    
+    def _refresh_exercise_styles(self):
+        """Rebuild the current exercise's counter/phase stylesheets (on exercise or language change)"""
+        current_color = self._exercise_color(self.current_exercise)
+        self._current_color = current_color
+        self._counter_qss = AppStyles.get_counter_value_style(current_color)
+        phase_group_qss = AppStyles.get_group_box_style() + AppStyles.get_phase_indicator_rules(current_color)
+        # Only an actual color change reparses the indicator rules
+        if phase_group_qss != getattr(self, '_phase_group_qss', None):
+            self._phase_group_qss = phase_group_qss
+            if getattr(self, 'phase_group', None) is not None:
+                self.phase_group.setStyleSheet(phase_group_qss)
+    
+    def _set_counter_qss(self, qss):
+        """Apply a counter stylesheet, skipping the restyle when it is already applied"""
+        if qss != self._shown_counter_qss:
+            self._shown_counter_qss = qss
+            self.counter_value.setStyleSheet(qss)
     
     def update_counter_style(self):
         """Update counter style to current exercise color"""
-        try:
-            # Get current exercise type display name
-            current_exercise = self.exercise_display_map.get(self.current_exercise, "")
-            
-            # If preset color not found, use default color
-            if current_exercise in AppStyles.EXERCISE_COLORS:
-                current_color = AppStyles.EXERCISE_COLORS[current_exercise]
-            else:
-                current_color = "#3498db"  # Default use blue
-                
-            self.counter_value.setStyleSheet(AppStyles.get_counter_value_style(current_color))
-        except Exception as e:
-            print(f"Error in update_counter_style: {e}")
-            # Use default color on error
-            self.counter_value.setStyleSheet(AppStyles.get_counter_value_style("#3498db"))
+        self._set_counter_qss(self._counter_qss)
     
     def reset_counter_style(self):
         """Reset counter style"""
-        try:
-            # Get current exercise type display name
-            current_exercise = self.exercise_display_map.get(self.current_exercise, "")
-            
-            # If preset color not found, use default color
-            if current_exercise in AppStyles.EXERCISE_COLORS:
-                current_color = AppStyles.EXERCISE_COLORS[current_exercise]
-            else:
-                current_color = "#3498db"  # Default use blue
-                
-            self.counter_value.setStyleSheet(AppStyles.get_counter_value_style(current_color))
-        except Exception as e:
-            print(f"Error in reset_counter_style: {e}")
-            # Use default color on error
-            self.counter_value.setStyleSheet(AppStyles.get_counter_value_style("#3498db"))
+        self._set_counter_qss(self._counter_qss)
         
     def update_language(self):
         """Update interface language"""
-        # Reload exercise type mappings from JSON file (with updated translations)
-        self.exercise_display_map = self.load_exercise_display_map()
+        # Reload exercise type mappings (with updated translations); cached per language
+        self.exercise_display_map, self.exercise_code_map = self._load_exercise_maps()
+        self._refresh_exercise_styles()
+        
+        # Resolve all labels' translations in one pass
+        tr = T.bulk(_UPDATE_LANGUAGE_KEYS)
         
         # Update model type mappings
         self.model_display_map = {
-            "lightweight": T.get("lightweight"),
-            "balanced": T.get("balanced"),
-            "performance": T.get("performance")
+            "lightweight": tr["lightweight"],
+            "balanced": tr["balanced"],
+            "performance": tr["performance"]
         }
         
-        # Update reverse mappings
-        self.exercise_code_map = {v: k for k, v in self.exercise_display_map.items()}
-        
         # Update UI text
-        self.title_label.setText(T.get("app_title"))
-        self.controls_group.setTitle(T.get("control_options"))
-        self.info_group.setTitle(T.get("exercise_data"))
-        self.phase_group.setTitle(T.get("motion_detection"))
+        self.title_label.setText(tr["app_title"])
+        self.controls_group.setTitle(tr["control_options"])
+        self.info_group.setTitle(tr["exercise_data"])
+        self.phase_group.setTitle(tr["motion_detection"])
         
-        self.counter_label.setText(T.get("count_completed"))
-        self.exercise_label.setText(T.get("exercise_type"))
+        self.counter_label.setText(tr["count_completed"])
+        self.exercise_label.setText(tr["exercise_type"])
 
         
         # Update switch text
-        self.skeleton_switch.label.setText(T.get("skeleton_display"))
-        self.mirror_switch.label.setText(T.get("mirror_mode"))
+        self.skeleton_switch.label.setText(tr["skeleton_display"])
+        self.mirror_switch.label.setText(tr["mirror_mode"])
         
         # Update button text
-        self.increase_button.setText(T.get("increase"))
-        self.decrease_button.setText(T.get("decrease"))
-        self.reset_button.setText(T.get("reset"))
-        self.confirm_button.setText(T.get("confirm"))
+        self.increase_button.setText(tr["increase"])
+        self.decrease_button.setText(tr["decrease"])
+        self.reset_button.setText(tr["reset"])
+        self.confirm_button.setText(tr["confirm"])
+        
+        # Stage text is translated; redraw it on the next update_phase/update_stage
+        self._shown_phase = _PHASE_UNKNOWN
+        self._shown_stage = None
         
         # Update phase label
         self.phase_title.setText(T.get(self.current_phase) if hasattr(self, "current_phase") else "")
         
         # Update combo boxes
-        self._update_combo_items(self.exercise_combo, self.exercise_display_map)
+        self._exercise_index = self._update_combo_items(
+            self.exercise_combo, self.exercise_display_map, self.current_exercise)
 
-    def _update_combo_items(self, combo_box, item_map):
-        """Update combo box content"""
-        # Save current selected data
-        current_data = combo_box.currentData()
+    def _update_combo_items(self, combo_box, item_map, current_data=None):
+        """Refill combo box content, keep the selection, and return its {data: index} map"""
+        # Save current selected data (callers may pass it when items carry no data yet)
+        if current_data is None:
+            current_data = combo_box.currentData()
         current_text = combo_box.currentText()
         
-        # Clear combo box
-        combo_box.clear()
-        
-        # Refill options
-        for code, display in item_map.items():
-            combo_box.addItem(display, code)
-        
-        # Try to restore previously selected item
-        if current_data:
-            # If there's data, restore based on data
-            for i in range(combo_box.count()):
-                if combo_box.itemData(i) == current_data:
-                    combo_box.setCurrentIndex(i)
-                    break
-        elif current_text:
-            # Otherwise try to restore based on text
-            for i in range(combo_box.count()):
-                if combo_box.itemText(i) == current_text:
-                    combo_box.setCurrentIndex(i)
-                    break
+        # The refill is not a user selection: no change signals while items are swapped
+        combo_box.blockSignals(True)
+        try:
+            combo_box.clear()
+            
+            # Refill options, indexing them as they go in
+            data_to_index = {}
+            for i, (code, display) in enumerate(item_map.items()):
+                combo_box.addItem(display, code)
+                data_to_index[code] = i
+            
+            # Try to restore previously selected item (by data, otherwise by text)
+            index = data_to_index.get(current_data)
+            if index is None and current_text:
+                index = combo_box.findText(current_text)
+            if index is not None and index >= 0:
+                combo_box.setCurrentIndex(index)
+        finally:
+            combo_box.blockSignals(False)
+        return data_to_index
     
     def restore_from_settings(self, settings_manager):
         """Restore control panel UI state from settings"""
         try:
             # Restore exercise type
             saved_exercise = settings_manager.get('exercise_type', 'overhead_press')
-            if saved_exercise in self.exercise_display_map:
-                display_name = self.exercise_display_map[saved_exercise]
-                index = self.exercise_combo.findText(display_name)
-                if index >= 0:
-                    self.exercise_combo.setCurrentIndex(index)
-                    print(f"[ControlPanel] 恢复运动类型: {saved_exercise}")
+            index = self._exercise_index.get(saved_exercise)
+            if index is not None:
+                self.exercise_combo.setCurrentIndex(index)
+                print(f"[ControlPanel] 恢复运动类型: {saved_exercise}")
             
-            # Restore TTS mode
-            saved_tts = settings_manager.get('tts_mode', 'sound')
-            tts_display_map = {'sound': '本地音效', 'ha': 'HA语音播报'}
-            if saved_tts in tts_display_map:
-                index = self.tts_mode_combo.findText(tts_display_map[saved_tts])
-                if index >= 0:
-                    self.tts_mode_combo.setCurrentIndex(index)
-                    print(f"[ControlPanel] 恢复TTS模式: {saved_tts}")
+            # TTS mode is restored by the main window (it also owns the HA connection)
             
             # Restore mirror mode
             saved_mirror = settings_manager.get('mirror_mode', True)
             self.mirror_switch.setChecked(saved_mirror)
             print(f"[ControlPanel] 恢复镜像模式: {saved_mirror}")
             
-        except Exception as e:
-            print(f"[ControlPanel] 恢复设置失败: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("[ControlPanel] 恢复设置失败")
 
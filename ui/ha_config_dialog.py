@@ -2,11 +2,16 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QLineEdit, QComboBox, QTableWidget,
                              QTableWidgetItem, QCheckBox, QTextEdit, QGroupBox,
                              QSpinBox, QMessageBox, QHeaderView, QWidget, QTabWidget)
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 from PyQt5.QtGui import QFont
 import json
 import os
 
+from core.ha_api_manager import HAAPIManager
+from core.json_utils import json_dumps
+
+TTS_CONFIG_PATH = os.path.join('data', 'tts_config.json')
+
 class ParameterRow(QWidget):
     """单个参数行组件"""
     delete_requested = pyqtSignal(object)  # 发送自己的引用
@@ -54,11 +59,15 @@ class ParameterRow(QWidget):
         delete_btn = QPushButton("✕")
         delete_btn.setMaximumWidth(30)
         delete_btn.setStyleSheet("QPushButton { color: red; font-weight: bold; }")
-        delete_btn.clicked.connect(lambda: self.delete_requested.emit(self))
+        delete_btn.clicked.connect(self._emit_delete)
         layout.addWidget(delete_btn)
         
         self.setLayout(layout)
     
+    def _emit_delete(self):
+        """请求删除本行（绑定方法连接，不为每行创建lambda闭包）"""
+        self.delete_requested.emit(self)
+    
     def create_value_widget(self, param_type, value):
         """根据类型创建值输入控件"""
         # 清空现有控件
@@ -90,10 +99,14 @@ class ParameterRow(QWidget):
             self.value_widget = QTextEdit()
             self.value_widget.setMaximumHeight(60)
             self.value_widget.setPlaceholderText("JSON格式...")
-            try:
-                self.value_widget.setPlainText(json.dumps(value, ensure_ascii=False, indent=2))
-            except:
-                self.value_widget.setPlainText(str(value))
+            if not value:
+                # 新建/空值：无需序列化
+                self.value_widget.setPlainText("{}" if param_type == "object" else "[]")
+            else:
+                try:
+                    self.value_widget.setPlainText(json_dumps(value, indent=True).decode('utf-8'))
+                except:
+                    self.value_widget.setPlainText(str(value))
             self.value_layout.addWidget(self.value_widget)
         
         # 更新var_check可见性（修复bug）
@@ -138,14 +151,37 @@ class ParameterRow(QWidget):
 class HAConfigDialog(QDialog):
     """Home Assistant API配置对话框"""
     
+    # (mtime, 解析后的tts_config.json)，切换预设时文件未修改则不重新解析
+    _preset_cache = None
+    
+    # 共享字体，首次打开对话框时创建（QFont需要在QApplication之后构造）
+    _BOLD_FONT = None
+    _MONO_FONT = None
+    
     def __init__(self, parent=None, config=None):
         super().__init__(parent)
         self.config = config or {}
-        self.param_rows = []
+        # id(row) -> ParameterRow，按插入顺序即显示顺序
+        self.param_rows = {}
+        # 参数行延迟到首次打开"参数设置"标签时创建；创建前保存原始参数列表
+        self._pending_params = None
+        # 预览/测试共用一个API管理器（首次使用时创建，复用其连接池）
+        self._api_manager = None
+        # 预览刷新去抖：短时间内多次请求只重建一次
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(150)
+        self._preview_timer.timeout.connect(self._do_update_preview)
         self.init_ui()
         self.load_config()
     
     def init_ui(self):
+        if HAConfigDialog._BOLD_FONT is None:
+            bold_font = QFont()
+            bold_font.setBold(True)
+            HAConfigDialog._BOLD_FONT = bold_font
+            HAConfigDialog._MONO_FONT = QFont("Consolas", 10)
+        
         self.setWindowTitle("Home Assistant API 配置")
         self.setMinimumSize(800, 600)
         
@@ -160,7 +196,8 @@ class HAConfigDialog(QDialog):
         
         # 参数设置标签  
         params_tab = self.create_params_tab()
-        tabs.addTab(params_tab, "参数设置")
+        self._params_tab_index = tabs.addTab(params_tab, "参数设置")
+        tabs.currentChanged.connect(self._on_tab_changed)
         
         # 预览标签
         preview_tab = self.create_preview_tab()
@@ -255,9 +292,7 @@ class HAConfigDialog(QDialog):
         
         # 标题
         title = QLabel("请求Body参数:")
-        title_font = QFont()
-        title_font.setBold(True)
-        title.setFont(title_font)
+        title.setFont(self._BOLD_FONT)
         layout.addWidget(title)
         
         # 参数列表容器
@@ -290,7 +325,7 @@ class HAConfigDialog(QDialog):
         
         self.preview_text = QTextEdit()
         self.preview_text.setReadOnly(True)
-        self.preview_text.setFont(QFont("Consolas", 10))
+        self.preview_text.setFont(self._MONO_FONT)
         layout.addWidget(self.preview_text)
         
         refresh_btn = QPushButton("刷新预览")
@@ -304,13 +339,12 @@ class HAConfigDialog(QDialog):
         """添加参数行"""
         param_row = ParameterRow(key, param_type, value, enabled, use_variables)
         param_row.delete_requested.connect(self.remove_parameter)
-        self.param_rows.append(param_row)
+        self.param_rows[id(param_row)] = param_row
         self.params_layout.addWidget(param_row)
     
     def remove_parameter(self, param_row):
         """删除参数行"""
-        if param_row in self.param_rows:
-            self.param_rows.remove(param_row)
+        if self.param_rows.pop(id(param_row), None) is not None:
             self.params_layout.removeWidget(param_row)
             param_row.deleteLater()
     
@@ -328,28 +362,31 @@ class HAConfigDialog(QDialog):
             return
         
         # 从配置文件加载预设
-        config_path = os.path.join('data', 'tts_config.json')
-        if os.path.exists(config_path):
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                preset = config.get('presets', {}).get(preset_key, {})
-                
-                if preset:
-                    self.path_input.setText(preset.get('service_path', ''))
-                    
-                    # 清空现有参数
-                    for row in self.param_rows[:]:
-                        self.remove_parameter(row)
-                    
-                    # 加载预设参数
-                    for param in preset.get('body_params', []):
-                        self.add_parameter(
-                            param.get('key', ''),
-                            param.get('type', 'string'),
-                            param.get('value', ''),
-                            param.get('enabled', True),
-                            param.get('use_variables', False)
-                        )
+        config = self._load_presets_config()
+        if config is None:
+            return
+        preset = config.get('presets', {}).get(preset_key, {})
+        
+        if preset:
+            self.path_input.setText(preset.get('service_path', ''))
+            
+            # 替换为预设参数（参数行尚未创建时只替换待加载列表）
+            if self._pending_params is not None:
+                self._pending_params = list(preset.get('body_params', []))
+            else:
+                self._load_params(preset.get('body_params', []), replace=True)
+    
+    @classmethod
+    def _load_presets_config(cls):
+        """读取tts_config.json；mtime未变化时返回缓存，文件不存在返回None"""
+        try:
+            mtime = os.path.getmtime(TTS_CONFIG_PATH)
+        except OSError:
+            return None
+        if cls._preset_cache is None or cls._preset_cache[0] != mtime:
+            with open(TTS_CONFIG_PATH, 'r', encoding='utf-8') as f:
+                cls._preset_cache = (mtime, json.load(f))
+        return cls._preset_cache[1]
     
     def load_config(self):
         """加载配置"""
@@ -359,21 +396,41 @@ class HAConfigDialog(QDialog):
         self.token_input.setText(ha_config.get('token', ''))
         self.path_input.setText(ha_config.get('service_path', ''))
         
-        # 加载参数
-        for param in ha_config.get('body_params', []):
-            self.add_parameter(
-                param.get('key', ''),
-                param.get('type', 'string'),
-                param.get('value', ''),
-                param.get('enabled', True),
-                param.get('use_variables', False)
-            )
+        # 参数行在首次查看参数标签时再创建
+        self._pending_params = list(ha_config.get('body_params', []))
+    
+    def _on_tab_changed(self, index):
+        """首次切换到参数标签时创建参数行"""
+        if index == self._params_tab_index and self._pending_params is not None:
+            params, self._pending_params = self._pending_params, None
+            self._load_params(params)
+    
+    def _load_params(self, params, replace=False):
+        """批量加载参数行：期间暂停容器重绘，全部添加完只重新布局一次"""
+        self.params_container.setUpdatesEnabled(False)
+        try:
+            if replace:
+                # 清空现有参数
+                for row in list(self.param_rows.values()):
+                    self.remove_parameter(row)
+            for param in params:
+                self.add_parameter(
+                    param.get('key', ''),
+                    param.get('type', 'string'),
+                    param.get('value', ''),
+                    param.get('enabled', True),
+                    param.get('use_variables', False)
+                )
+        finally:
+            self.params_container.setUpdatesEnabled(True)
     
     def get_config(self):
         """获取配置"""
-        params = []
-        for row in self.param_rows:
-            params.append(row.get_param_data())
+        if self._pending_params is not None:
+            # 参数标签未打开过：参数未被编辑，原样返回
+            params = list(self._pending_params)
+        else:
+            params = [row.get_param_data() for row in self.param_rows.values()]
         
         return {
             'base_url': self.url_input.text(),
@@ -382,12 +439,30 @@ class HAConfigDialog(QDialog):
             'body_params': params
         }
     
+    def _get_api_manager(self, config):
+        """返回按当前输入更新过地址和令牌的共享API管理器"""
+        if self._api_manager is None:
+            self._api_manager = HAAPIManager(config['base_url'], config['token'])
+        else:
+            self._api_manager.update_config(config['base_url'], config['token'])
+        return self._api_manager
+    
+    def done(self, result):
+        """关闭对话框时释放API管理器的连接池"""
+        self._preview_timer.stop()
+        if self._api_manager is not None:
+            self._api_manager.close()
+            self._api_manager = None
+        super().done(result)
+    
     def update_preview(self):
+        """请求刷新预览（去抖，150ms内的多次请求合并为一次）"""
+        self._preview_timer.start()
+    
+    def _do_update_preview(self):
         """更新预览"""
-        from core.ha_api_manager import HAAPIManager
-        
         config = self.get_config()
-        manager = HAAPIManager(config['base_url'], config['token'])
+        manager = self._get_api_manager(config)
         
         # 模拟变量
         variables = {'count': 5, 'exercise': '深蹲', 'total': 10}
@@ -404,10 +479,8 @@ class HAConfigDialog(QDialog):
     
     def test_connection(self):
         """测试连接"""
-        from core.ha_api_manager import HAAPIManager
-        
         config = self.get_config()
-        manager = HAAPIManager(config['base_url'], config['token'])
+        manager = self._get_api_manager(config)
         
         success, message = manager.test_connection()
         
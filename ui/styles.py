@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from PyQt5.QtGui import QColor, QPalette, QFont
 from PyQt5.QtCore import Qt
 
@@ -35,6 +37,37 @@ class AppStyles:
         "Right Knee Press": "#6c3483"    # Dark purple variant
     }
     
+    # Statistics panel tab widget
+    STATS_TABS_QSS = """
+            QTabWidget::pane { 
+                border: 1px solid #bdc3c7;
+                border-radius: 5px;
+                padding: 15px; 
+                background-color: #f8f9fa;
+            }
+            QTabBar::tab {
+                background-color: #ecf0f1; 
+                border: 1px solid #bdc3c7;
+                border-bottom: none;
+                border-top-left-radius: 5px;
+                border-top-right-radius: 5px;
+                padding: 10px 20px;
+                margin-right: 3px;
+                font-family: 'Microsoft YaHei';
+                font-size: 16px;
+                font-weight: bold;
+                min-width: 150px;
+            }
+            QTabBar::tab:selected {
+                background-color: #f8f9fa;
+                border-bottom: 2px solid #3498db;
+                color: #2980b9;
+            }
+            QTabBar::tab:hover:!selected {
+                background-color: #e0e0e0;
+            }
+        """
+    
     @staticmethod
     def get_window_palette():
         """Get window palette"""
@@ -97,7 +130,9 @@ class AppStyles:
             }
         """
     
+    # Parameterized getters are memoized: update_phase/update_angle call them per frame
     @staticmethod
+    @lru_cache(maxsize=64)
     def get_counter_value_style(color="#27ae60"):
         """Get counter style"""
         return f"""
@@ -126,6 +161,7 @@ class AppStyles:
         """
     
     @staticmethod
+    @lru_cache(maxsize=64)
     def get_angle_value_style(color="#34495e", highlight=False):
         """Get angle value style"""
         border_color = "#e74c3c" if highlight else "#e8e8e8"
@@ -143,6 +179,7 @@ class AppStyles:
         """
     
     @staticmethod
+    @lru_cache(maxsize=64)
     def get_phase_indicator_style(active=False, color="#3498db"):
         """Get phase indicator style"""
         bg_color = color if active else "#bdc3c7"
@@ -159,6 +196,16 @@ class AppStyles:
             text-align: center;
         """
     
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def get_phase_indicator_rules(accent_color="#3498db"):
+        """Get phase indicator rules keyed on the labels' "phase" property (idle/on/accent)"""
+        return (
+            f'QLabel[phase="idle"] {{{AppStyles.get_phase_indicator_style(False)}}}'
+            f'QLabel[phase="on"] {{{AppStyles.get_phase_indicator_style(True)}}}'
+            f'QLabel[phase="accent"] {{{AppStyles.get_phase_indicator_style(True, accent_color)}}}'
+        )
+    
     @staticmethod
     def get_group_box_style():
         """Get group box style"""
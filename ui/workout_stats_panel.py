@@ -2,11 +2,10 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTabWidget,
                              QSizePolicy)
 from PyQt5.QtCore import Qt, pyqtSignal
 import datetime
-import json
-import os
-import sys
+import logging
 
 from core.translations import Translations as T
+from core.exercise_data import get_exercises_file_path, load_exercises
 
 from .stats_components.today_tab import TodayProgressTab
 from .stats_components.week_tab import WeekStatsTab
@@ -14,9 +13,45 @@ from .stats_components.month_tab import MonthStatsTab
 from .stats_components.goals_tab import GoalsTab
 from .styles import AppStyles
 
+logger = logging.getLogger(__name__)
+
+# (exercises dict from core.exercise_data, {lang: name_map}); the per-language maps are
+# read-only, shared by all panels and dropped whenever the shared parse is replaced
+_NAME_MAPS = (None, {})
+
+
+def _name_maps_for(exercises):
+    """Per-language name map cache for this parse of exercises.json"""
+    global _NAME_MAPS
+    if _NAME_MAPS[0] is not exercises:
+        _NAME_MAPS = (exercises, {})
+    return _NAME_MAPS[1]
+
+
 class WorkoutStatsPanel(QWidget):
     """Fitness statistics and planning panel"""
     
+    # Static UI strings of setup_ui/update_language, resolved once per language
+    _UI_KEYS = ("fitness_statistics", "workout_stats_panel",
+                "today_tab", "week_tab", "month_tab", "goals_tab",
+                "today_progress", "week_stats", "month_stats", "fitness_goals")
+    # language -> {key: text}, shared by all panels
+    _ui_text_cache = {}
+    
+    # Statistics tabs in display order (all tab signals are relayed signal-to-signal,
+    # so Qt forwards them without a Python slot):
+    # (attribute, tab class, title key, ((tab signal, panel slot/signal attribute), ...),
+    #  whether the tab's update_language also takes the code map)
+    _TAB_SPECS = (
+        ("today_progress_tab", TodayProgressTab, "today_tab", (), True),
+        ("week_stats_tab", WeekStatsTab, "week_tab", (), False),
+        ("month_stats_tab", MonthStatsTab, "month_tab",
+         (("month_changed", "month_changed"),), False),
+        ("goals_tab", GoalsTab, "goals_tab",
+         (("goal_updated", "goal_updated"),
+          ("weekly_goal_updated", "weekly_goal_updated")), False),
+    )
+    
     # Define signals
     goal_updated = pyqtSignal(str, int)  # Exercise type, goal value
     weekly_goal_updated = pyqtSignal(int)  # Weekly workout days
@@ -25,6 +60,8 @@ class WorkoutStatsPanel(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.exercise_colors = AppStyles.EXERCISE_COLORS
+        # Language last applied by update_language (None: never applied yet)
+        self._applied_lang = None
         
         # Use translation module to generate exercise name mappings from JSON file
         self.update_exercise_mappings()
@@ -32,81 +69,80 @@ class WorkoutStatsPanel(QWidget):
         # Initialize UI
         self.setup_ui()
     
-    def get_exercises_file_path(self):
-        """Get exercises.json file path, compatible with development and packaged environments"""
-        if getattr(sys, 'frozen', False):
-            # Packaged environment
-            # First check for external data folder next to exe (user editable)
-            exe_dir = os.path.dirname(sys.executable)
-            external_file = os.path.join(exe_dir, 'data', 'exercises.json')
-            if os.path.exists(external_file):
-                return external_file
-            # Fall back to bundled data inside exe
-            base_path = sys._MEIPASS
-            exercises_file = os.path.join(base_path, 'data', 'exercises.json')
-        else:
-            # Development environment, data files are in project directory
-            exercises_file = os.path.join('data', 'exercises.json')
-        
-        return exercises_file
+    @property
+    def exercise_name_map(self):
+        """Exercise code -> display name for the current language"""
+        return self._exercise_name_map
+    
+    @exercise_name_map.setter
+    def exercise_name_map(self, name_map):
+        self._exercise_name_map = name_map
+        # Inverse map is rebuilt on its next access
+        self._code_map_cache = None
+    
+    @property
+    def exercise_code_map(self):
+        """Display name -> exercise code, built on first access after the name map changes"""
+        if self._code_map_cache is None:
+            self._code_map_cache = {v: k for k, v in self._exercise_name_map.items()}
+        return self._code_map_cache
     
     def update_exercise_mappings(self):
         """Update exercise name mappings from JSON file"""
-        exercises_file = self.get_exercises_file_path()
+        exercises_file = get_exercises_file_path()
         
         try:
-            if os.path.exists(exercises_file):
-                with open(exercises_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    exercises = data.get('exercises', {})
-                    
-                    # Build exercise_name_map from JSON file
-                    exercise_map = {}
-                    current_lang = T.get_language()  # Get current language setting
-                    
-                    for exercise_type, config in exercises.items():
-                        # Get display name from JSON file based on current language
-                        if current_lang == 'zh':
-                            display_name = config.get('name_zh', '')
-                        elif current_lang == 'en':
-                            display_name = config.get('name_en', '')
-                        else:
-                            # Fallback to English if language not supported
-                            display_name = config.get('name_en', '')
-                        
-                        # If name not found in JSON, try translation module as fallback
-                        if not display_name:
-                            display_name = T.get(exercise_type)
-                        
-                        if display_name:
-                            exercise_map[exercise_type] = display_name
-                    
-                    if exercise_map:
-                        self.exercise_name_map = exercise_map
-                        self.exercise_code_map = {v: k for k, v in self.exercise_name_map.items()}
-                        return
-                    else:
-                        print(f"WARNING: No exercises found in {exercises_file}")
-                        self.exercise_name_map = {}
-                        self.exercise_code_map = {}
-                        return
+            try:
+                exercises = load_exercises(exercises_file)
+            except FileNotFoundError:
+                logger.error("Exercises file not found at %s, please ensure data/exercises.json exists",
+                             exercises_file)
+                self.exercise_name_map = {}
+                return
             
-            # File not found
-            print(f"ERROR: Exercises file not found at {exercises_file}")
-            print("Please ensure data/exercises.json exists")
-            self.exercise_name_map = {}
-            self.exercise_code_map = {}
+            current_lang = T.get_language()  # Get current language setting
+            
+            lang_maps = _name_maps_for(exercises)
+            exercise_map = lang_maps.get(current_lang)
+            if exercise_map is None:
+                # Pick the JSON name field once (unsupported languages fall back to English)
+                name_key = 'name_zh' if current_lang == 'zh' else 'name_en'
+                
+                # Build exercise_name_map from JSON file
+                exercise_map = {}
+                for exercise_type, config in exercises.items():
+                    # If name not found in JSON, try translation module as fallback
+                    display_name = config.get(name_key) or T.get(exercise_type)
+                    if display_name:
+                        exercise_map[exercise_type] = display_name
+                
+                lang_maps[current_lang] = exercise_map
+            
+            if exercise_map:
+                self.exercise_name_map = exercise_map
+            else:
+                logger.warning("No exercises found in %s", exercises_file)
+                self.exercise_name_map = {}
         except Exception as e:
-            print(f"ERROR loading exercises from JSON: {e}")
+            logger.error("Error loading exercises from JSON: %s", e)
             self.exercise_name_map = {}
-            self.exercise_code_map = {}
+    
+    @classmethod
+    def _ui_texts(cls):
+        """Translated static UI strings for the current language"""
+        lang = T.get_language()
+        texts = cls._ui_text_cache.get(lang)
+        if texts is None:
+            texts = cls._ui_text_cache[lang] = T.bulk(cls._UI_KEYS)
+        return texts
     
     def setup_ui(self):
         """Setup UI components"""
         self.layout = QVBoxLayout(self)
+        texts = self._ui_texts()
         
         # Create top title
-        self.title_label = QLabel(T.get("fitness_statistics"))
+        self.title_label = QLabel(texts["fitness_statistics"])
         self.title_label.setAlignment(Qt.AlignCenter)
         self.title_label.setStyleSheet("color: #2c3e50; font-size: 20pt; font-weight: bold; margin: 15px 0; padding: 10px;")
         self.layout.addWidget(self.title_label)
@@ -115,116 +151,138 @@ class WorkoutStatsPanel(QWidget):
         self.tabs = QTabWidget()
         self.tabs.setTabPosition(QTabWidget.North)
         self.tabs.setTabShape(QTabWidget.Rounded)
-        self.tabs.setStyleSheet("""
-            QTabWidget::pane { 
-                border: 1px solid #bdc3c7;
-                border-radius: 5px;
-                padding: 15px; 
-                background-color: #f8f9fa;
-            }
-            QTabBar::tab {
-                background-color: #ecf0f1; 
-                border: 1px solid #bdc3c7;
-                border-bottom: none;
-                border-top-left-radius: 5px;
-                border-top-right-radius: 5px;
-                padding: 10px 20px;
-                margin-right: 3px;
-                font-family: 'Microsoft YaHei';
-                font-size: 16px;
-                font-weight: bold;
-                min-width: 150px;
-            }
-            QTabBar::tab:selected {
-                background-color: #f8f9fa;
-                border-bottom: 2px solid #3498db;
-                color: #2980b9;
-            }
-            QTabBar::tab:hover:!selected {
-                background-color: #e0e0e0;
-            }
-        """)
-        
-        # Create statistics components
-        self.today_progress_tab = TodayProgressTab(self.exercise_name_map, self.exercise_colors)
-        self.week_stats_tab = WeekStatsTab(self.exercise_name_map, self.exercise_colors)
-        self.month_stats_tab = MonthStatsTab(self.exercise_name_map, self.exercise_colors)
-        self.goals_tab = GoalsTab(self.exercise_name_map, self.exercise_colors)
-        
-        # Connect goal update signals
-        self.goals_tab.goal_updated.connect(self.goal_updated)
-        self.goals_tab.weekly_goal_updated.connect(self.weekly_goal_updated)
+        self.tabs.setStyleSheet(AppStyles.STATS_TABS_QSS)
         
-        # Connect month change signal
-        self.month_stats_tab.month_changed.connect(self._on_month_changed)
-        
-        # Add tabs
-        self.tabs.addTab(self.today_progress_tab, T.get("today_tab"))
-        self.tabs.addTab(self.week_stats_tab, T.get("week_tab"))
-        self.tabs.addTab(self.month_stats_tab, T.get("month_tab"))
-        self.tabs.addTab(self.goals_tab, T.get("goals_tab"))
+        # Create statistics components; only the default tab is built up front,
+        # the others get a placeholder page and are built by _ensure_tab when first shown
+        self._unbuilt_tabs = set()
+        # Tab index -> {method name: latest args} received before that tab was built
+        self._pending_tab_calls = {}
+        # (bound update_language, takes code map) of each built tab
+        self._lang_updaters = []
+        for index, (attr, _, title_key, _, _) in enumerate(self._TAB_SPECS):
+            if index == 0:
+                widget = self._build_tab(index)
+            else:
+                setattr(self, attr, None)
+                self._unbuilt_tabs.add(index)
+                widget = QWidget()
+            self.tabs.addTab(widget, texts[title_key])
         
         # Set default tab to "Today's Progress"
         self.tabs.setCurrentIndex(0)
+        self.tabs.currentChanged.connect(self._ensure_tab)
         
         self.layout.addWidget(self.tabs)
         
+    def _build_tab(self, index):
+        """Create the tab at index from _TAB_SPECS and connect its signals"""
+        attr, tab_class, _, signals, with_codes = self._TAB_SPECS[index]
+        widget = tab_class(self.exercise_name_map, self.exercise_colors)
+        for signal, slot in signals:
+            getattr(widget, signal).connect(getattr(self, slot))
+        updater = getattr(widget, 'update_language', None)
+        if updater is not None:
+            self._lang_updaters.append((updater, with_codes))
+        setattr(self, attr, widget)
+        return widget
+    
+    def _ensure_tab(self, index):
+        """Build a deferred tab the first time it is shown and replay data sent to it meanwhile"""
+        if index not in self._unbuilt_tabs:
+            return
+        self._unbuilt_tabs.discard(index)
+        
+        widget = self._build_tab(index)
+        placeholder = self.tabs.widget(index)
+        title = self.tabs.tabText(index)
+        
+        # Swapping the page must not re-enter this handler
+        self.tabs.blockSignals(True)
+        try:
+            self.tabs.removeTab(index)
+            self.tabs.insertTab(index, widget, title)
+            self.tabs.setCurrentIndex(index)
+        finally:
+            self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+        
+        for method, args in self._pending_tab_calls.pop(index, {}).items():
+            getattr(widget, method)(*args)
+    
+    def _call_tab(self, index, method, *args):
+        """Call a tab method now, or keep the latest call until the tab is built"""
+        if index in self._unbuilt_tabs:
+            self._pending_tab_calls.setdefault(index, {})[method] = args
+        else:
+            getattr(getattr(self, self._TAB_SPECS[index][0]), method)(*args)
+    
     def update_today_stats(self, stats, goals):
         """Update today's statistics data"""
         if "exercises" in stats:
+            today_tab = self.today_progress_tab
+            progress_bars = today_tab.progress_bars
+            daily_goals = goals["daily"]
+            
+            # Update progress bars and accumulate the total in the same pass
+            total_count = 0
             for exercise_code, data in stats["exercises"].items():
-                if exercise_code in self.today_progress_tab.progress_bars:
-                    current = data.get("count", 0)
-                    goal = goals["daily"].get(exercise_code, 0)
-                    self.today_progress_tab.update_progress(exercise_code, current, goal)
+                current = data.get("count", 0)
+                total_count += current
+                if exercise_code in progress_bars:
+                    today_tab.update_progress(exercise_code, current, daily_goals.get(exercise_code, 0))
             
             # Update total
-            total_count = sum(data.get("count", 0) for data in stats["exercises"].values())
-            self.today_progress_tab.update_total(total_count)
+            today_tab.update_total(total_count)
     
     def update_week_stats(self, stats, goals):
         """Update weekly statistics data"""
-        self.week_stats_tab.update_stats(stats, goals)
+        self._call_tab(1, 'update_stats', stats, goals)
     
     def update_month_stats(self, stats, goals):
         """Update monthly statistics data"""
-        self.month_stats_tab.update_stats(stats, goals)
+        self._call_tab(2, 'update_stats', stats, goals)
     
     def set_goals(self, goals):
         """Set goal values"""
-        self.goals_tab.set_goals(goals)
+        self._call_tab(3, 'set_goals', goals)
         
         # Pass daily goals to today's progress tab to show exercise items with goals
         if hasattr(self.today_progress_tab, 'show_exercises_with_goals') and 'daily' in goals:
             self.today_progress_tab.show_exercises_with_goals(goals['daily'])
     
-    def _on_month_changed(self, year, month):
-        # Emit signal to notify main application that data for specified month is needed
-        self.month_changed.emit(year, month)
-    
     def update_language(self):
         """Update interface language"""
-        # Update title
-        self.title_label.setText(T.get("workout_stats_panel"))
-        
-        # Update exercise name mappings
-        self.update_exercise_mappings()
-        
-        # Update tab titles
-        self.tabs.setTabText(0, T.get("today_progress"))
-        self.tabs.setTabText(1, T.get("week_stats"))
-        self.tabs.setTabText(2, T.get("month_stats"))
-        self.tabs.setTabText(3, T.get("fitness_goals"))
+        # Nothing to retranslate if this language is already applied
+        lang = T.get_language()
+        if lang == self._applied_lang:
+            return
+        self._applied_lang = lang
         
-        # If each tab has update_language method, call it
-        if hasattr(self.today_progress_tab, 'update_language'):
-            self.today_progress_tab.update_language(self.exercise_name_map, self.exercise_code_map)
+        # Retranslate everything with painting suspended, then repaint once
+        self.setUpdatesEnabled(False)
+        try:
+            texts = self._ui_texts()
+            
+            # Update title
+            self.title_label.setText(texts["workout_stats_panel"])
             
-        if hasattr(self.week_stats_tab, 'update_language'):
-            self.week_stats_tab.update_language(self.exercise_name_map)
+            # Update exercise name mappings
+            self.update_exercise_mappings()
             
-        if hasattr(self.month_stats_tab, 'update_language'):
-            self.month_stats_tab.update_language(self.exercise_name_map)
+            # Update tab titles
+            self.tabs.setTabText(0, texts["today_progress"])
+            self.tabs.setTabText(1, texts["week_stats"])
+            self.tabs.setTabText(2, texts["month_stats"])
+            self.tabs.setTabText(3, texts["fitness_goals"])
             
-        if hasattr(self.goals_tab, 'update_language'):
-            self.goals_tab.update_language(self.exercise_name_map)
\ No newline at end of file
+            # Call update_language of each built tab that has one
+            # (tabs not built yet are created later with the current language and maps)
+            for updater, with_codes in self._lang_updaters:
+                if with_codes:
+                    updater(self.exercise_name_map, self.exercise_code_map)
+                else:
+                    updater(self.exercise_name_map)
+        finally:
+            self.setUpdatesEnabled(True)
+            self.update()
\ No newline at end of file